@@ -10,7 +10,17 @@ from app.core.config import settings
 from app.db.base import Base
 
 # Import all models so Alembic can detect them
-from app.models import attachment, entry, link, tag, user
+from app.models import (
+    attachment,
+    entry,
+    link,
+    shared_cache_entry,
+    tag,
+    token_revocation,
+    user,
+    user_daily_count,
+    user_stats,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,46 @@
+"""add full-text search vector to entries
+
+Revision ID: 3cd675471ee2
+Revises: 2bc574360dd1
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3cd675471ee2"
+down_revision: Union[str, None] = "2bc574360dd1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("entries", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # Backfill with the same weighting entry_repo uses on write: title (A) > content (B)
+    op.execute(
+        """
+        UPDATE entries
+        SET search_vector =
+            setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english'::regconfig, content), 'B')
+        """
+    )
+
+    op.create_index(
+        "ix_entries_search_vector",
+        "entries",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_entries_search_vector", table_name="entries", postgresql_using="gin")
+    op.drop_column("entries", "search_vector")
@@ -0,0 +1,50 @@
+"""add pg_trgm indexes for substring and fuzzy search
+
+Revision ID: 4de786582ff3
+Revises: 3cd675471ee2
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4de786582ff3"
+down_revision: Union[str, None] = "3cd675471ee2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_index(
+        "ix_entries_title_trgm",
+        "entries",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_entries_content_trgm",
+        "entries",
+        ["content"],
+        postgresql_using="gin",
+        postgresql_ops={"content": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_tags_name_trgm",
+        "tags",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tags_name_trgm", table_name="tags")
+    op.drop_index("ix_entries_content_trgm", table_name="entries")
+    op.drop_index("ix_entries_title_trgm", table_name="entries")
+    # The extension is left installed; other objects may depend on it.
@@ -0,0 +1,31 @@
+"""add composite index for keyset pagination of entries
+
+Revision ID: 5ef897693004
+Revises: 4de786582ff3
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5ef897693004"
+down_revision: Union[str, None] = "4de786582ff3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_entries_user_date_created_id",
+        "entries",
+        ["user_id", sa.text("date DESC"), sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_entries_user_date_created_id", table_name="entries")
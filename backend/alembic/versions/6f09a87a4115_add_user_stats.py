@@ -0,0 +1,40 @@
+"""add user_stats with maintained entry counter
+
+Revision ID: 6f09a87a4115
+Revises: 5ef897693004
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "6f09a87a4115"
+down_revision: Union[str, None] = "5ef897693004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("total_entries", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Backfill counters for users that already have entries
+    op.execute(
+        """
+        INSERT INTO user_stats (user_id, total_entries)
+        SELECT user_id, COUNT(*) FROM entries GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -0,0 +1,43 @@
+"""add entry excerpt and child-table entry_id indexes for summary lists
+
+Revision ID: 7a1ba98b5226
+Revises: 6f09a87a4115
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7a1ba98b5226"
+down_revision: Union[str, None] = "6f09a87a4115"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "entries",
+        sa.Column("excerpt", sa.String(length=200), server_default="", nullable=False),
+    )
+
+    # Backfill with the same rule entry_repo uses on write: collapse whitespace, keep 200 chars
+    op.execute(
+        r"""
+        UPDATE entries
+        SET excerpt = left(regexp_replace(btrim(content), '\s+', ' ', 'g'), 200)
+        """
+    )
+
+    # Summary lists count links / attachments per entry
+    op.create_index("ix_links_entry_id", "links", ["entry_id"], unique=False)
+    op.create_index("ix_attachments_entry_id", "attachments", ["entry_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attachments_entry_id", table_name="attachments")
+    op.drop_index("ix_links_entry_id", table_name="links")
+    op.drop_column("entries", "excerpt")
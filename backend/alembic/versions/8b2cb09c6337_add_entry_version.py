@@ -0,0 +1,30 @@
+"""add optimistic-concurrency version to entries
+
+Revision ID: 8b2cb09c6337
+Revises: 7a1ba98b5226
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2cb09c6337"
+down_revision: Union[str, None] = "7a1ba98b5226"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default is a metadata-only change, no table rewrite.
+    op.add_column(
+        "entries",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("entries", "version")
@@ -0,0 +1,29 @@
+"""add data version to user_stats
+
+Revision ID: 9c3dc1a07448
+Revises: 8b2cb09c6337
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3dc1a07448"
+down_revision: Union[str, None] = "8b2cb09c6337"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_stats",
+        sa.Column("data_version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_stats", "data_version")
@@ -0,0 +1,41 @@
+"""add user_daily_counts heatmap rollup
+
+Revision ID: ad4ed2b18559
+Revises: 9c3dc1a07448
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "ad4ed2b18559"
+down_revision: Union[str, None] = "9c3dc1a07448"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_daily_counts",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "date"),
+    )
+
+    # Backfill from existing entries
+    op.execute(
+        """
+        INSERT INTO user_daily_counts (user_id, date, count)
+        SELECT user_id, date, COUNT(*) FROM entries GROUP BY user_id, date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_daily_counts")
@@ -0,0 +1,123 @@
+"""add maintained dashboard summary to user_stats
+
+Revision ID: be5fe3c29660
+Revises: ad4ed2b18559
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "be5fe3c29660"
+down_revision: Union[str, None] = "ad4ed2b18559"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tags", sa.Column("entry_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column(
+        "user_stats",
+        sa.Column(
+            "month_counts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+    op.add_column("user_stats", sa.Column("streak_end", sa.Date(), nullable=True))
+    op.add_column(
+        "user_stats", sa.Column("streak_length", sa.Integer(), server_default="0", nullable=False)
+    )
+    op.add_column(
+        "user_stats", sa.Column("longest_streak", sa.Integer(), server_default="0", nullable=False)
+    )
+    op.add_column("user_stats", sa.Column("top_tag", sa.String(length=100), nullable=True))
+
+    # Backfill: tag usage, then per-month counts, streaks and top tag per user
+    op.execute(
+        """
+        UPDATE tags SET entry_count = c.n
+        FROM (SELECT tag_id, COUNT(*) AS n FROM entry_tags GROUP BY tag_id) c
+        WHERE tags.id = c.tag_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE user_stats s SET month_counts = m.counts
+        FROM (
+            SELECT user_id, jsonb_object_agg(month, n) AS counts
+            FROM (
+                SELECT user_id, to_char(date, 'YYYY-MM') AS month, SUM(count)::int AS n
+                FROM user_daily_counts
+                WHERE count > 0
+                GROUP BY user_id, month
+            ) per_month
+            GROUP BY user_id
+        ) m
+        WHERE s.user_id = m.user_id
+        """
+    )
+    op.execute(
+        """
+        WITH grouped AS (
+            SELECT
+                user_id,
+                date,
+                date - (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY date))::int AS grp
+            FROM user_daily_counts
+            WHERE count > 0
+        ),
+        islands AS (
+            SELECT user_id, MAX(date) AS last_date, COUNT(*)::int AS len
+            FROM grouped
+            GROUP BY user_id, grp
+        ),
+        latest AS (
+            SELECT DISTINCT ON (user_id) user_id, last_date, len
+            FROM islands
+            ORDER BY user_id, last_date DESC
+        ),
+        longest AS (
+            SELECT user_id, MAX(len) AS len FROM islands GROUP BY user_id
+        )
+        UPDATE user_stats s
+        SET streak_end = latest.last_date,
+            streak_length = latest.len,
+            longest_streak = longest.len
+        FROM latest JOIN longest USING (user_id)
+        WHERE s.user_id = latest.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE user_stats s SET top_tag = (
+            SELECT t.name FROM tags t
+            WHERE t.user_id = s.user_id AND t.entry_count > 0
+            ORDER BY t.entry_count DESC, t.name
+            LIMIT 1
+        )
+        """
+    )
+
+    op.create_index(
+        "ix_tags_user_entry_count",
+        "tags",
+        ["user_id", sa.text("entry_count DESC"), "name"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tags_user_entry_count", table_name="tags")
+    op.drop_column("user_stats", "top_tag")
+    op.drop_column("user_stats", "longest_streak")
+    op.drop_column("user_stats", "streak_length")
+    op.drop_column("user_stats", "streak_end")
+    op.drop_column("user_stats", "month_counts")
+    op.drop_column("tags", "entry_count")
@@ -0,0 +1,38 @@
+"""add unlogged shared_cache table
+
+Revision ID: cf60a4d3a771
+Revises: be5fe3c29660
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "cf60a4d3a771"
+down_revision: Union[str, None] = "be5fe3c29660"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shared_cache",
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column("value", sa.LargeBinary(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index("ix_shared_cache_expires_at", "shared_cache", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shared_cache_expires_at", table_name="shared_cache")
+    op.drop_table("shared_cache")
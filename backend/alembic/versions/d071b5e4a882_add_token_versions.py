@@ -0,0 +1,47 @@
+"""add users.token_version and token_revocations
+
+Revision ID: d071b5e4a882
+Revises: cf60a4d3a771
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d071b5e4a882"
+down_revision: Union[str, None] = "cf60a4d3a771"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default is a metadata-only change, no table rewrite.
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "token_revocations",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("min_version", sa.Integer(), nullable=False),
+        sa.Column(
+            "revoked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_token_revocations_revoked_at", "token_revocations", ["revoked_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_token_revocations_revoked_at", table_name="token_revocations")
+    op.drop_table("token_revocations")
+    op.drop_column("users", "token_version")
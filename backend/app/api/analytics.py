@@ -2,34 +2,51 @@
 
 import datetime as _dt
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import data_etag, etag_matches, not_modified, set_validators
 from app.db.session import get_db
-from app.models.user import User
 from app.schemas.analytics import HeatmapDay, SummaryResponse
+from app.schemas.auth import CurrentUser
 from app.services.analytics_service import get_heatmap, get_summary
 from app.services.auth_service import get_current_user
+from app.services.entry_service import get_data_version, get_data_version_and_date
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/heatmap", response_model=list[HeatmapDay])
 async def heatmap(
+    response: Response,
     start_date: _dt.date | None = Query(None, description="Start date (inclusive, YYYY-MM-DD)"),
     end_date: _dt.date | None = Query(None, description="End date (inclusive, YYYY-MM-DD)"),
-    user: User = Depends(get_current_user),
+    if_none_match: str | None = Header(None),
+    user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Return date/count pairs for the heatmap calendar."""
+    etag = data_etag(user.id, await get_data_version(user.id, db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
     return await get_heatmap(user.id, db, start_date=start_date, end_date=end_date)
 
 
 @router.get("/summary", response_model=SummaryResponse)
 async def summary(
-    user: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Return aggregated dashboard metrics."""
-    data = await get_summary(user.id, db)
+    # Streaks and "this month" move with the calendar, not only with writes;
+    # the ETag and the metrics take "today" from the database alike.
+    version, today = await get_data_version_and_date(user.id, db)
+    etag = data_etag(user.id, version, today)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    data = await get_summary(user.id, db, today=today)
     return SummaryResponse(**data)
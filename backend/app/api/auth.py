@@ -6,18 +6,39 @@ from app.core.limiter import limiter
 from app.core.security import create_access_token
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.auth import AuthMessage, ChangePassword, UserLogin, UserRegister, UserResponse
+from app.schemas.auth import (
+    AuthMessage,
+    ChangePassword,
+    CurrentUser,
+    UserLogin,
+    UserRegister,
+    UserResponse,
+)
 from app.services.auth_service import (
     authenticate_user,
     change_password,
     delete_account,
     get_current_user,
+    get_profile,
     register_user,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _set_auth_cookie(response: Response, user: User) -> None:
+    """Issue a fresh access token for *user* in the HTTP-only auth cookie."""
+    response.set_cookie(
+        key="access_token",
+        value=create_access_token(str(user.id), user.token_version),
+        httponly=True,
+        secure=settings.is_production,
+        samesite="none" if settings.is_production else "lax",
+        max_age=7 * 24 * 60 * 60,  # 7 days
+        path="/",  # Explicitly set path to root
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=201)
 @limiter.limit("5/minute")
 async def register(request: Request, data: UserRegister, db: AsyncSession = Depends(get_db)):
@@ -36,17 +57,7 @@ async def login(
 ):
     """Login and set JWT in HTTP-only cookie."""
     user = await authenticate_user(data.email, data.password, db)
-    token = create_access_token(str(user.id))
-
-    response.set_cookie(
-        key="access_token",
-        value=token,
-        httponly=True,
-        secure=settings.is_production,
-        samesite="none" if settings.is_production else "lax",
-        max_age=7 * 24 * 60 * 60,  # 7 days
-        path="/",  # Explicitly set path to root
-    )
+    _set_auth_cookie(response, user)
 
     return {"message": "Login successful"}
 
@@ -65,26 +76,34 @@ async def logout(response: Response):
 
 
 @router.get("/me", response_model=UserResponse)
-async def me(current_user: User = Depends(get_current_user)):
+async def me(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
     """Get the currently authenticated user."""
-    return current_user
+    return await get_profile(current_user, db)
 
 
 @router.put("/password", response_model=AuthMessage)
 async def update_password(
     data: ChangePassword,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Change the current user's password."""
-    await change_password(current_user, data, db)
+    """Change the current user's password.
+
+    Every other session is signed out; this one gets a fresh token.
+    """
+    user = await change_password(current_user, data, db)
+    _set_auth_cookie(response, user)
     return {"message": "Password updated successfully"}
 
 
 @router.delete("/account", status_code=204)
 async def remove_account(
     response: Response,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Permanently delete the current user's account and all data."""
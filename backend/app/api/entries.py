@@ -1,36 +1,95 @@
 """Entry CRUD API routes."""
 
+import json
 import uuid
+from collections.abc import AsyncIterator
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import (
+    data_etag,
+    entry_etag,
+    etag_matches,
+    not_modified,
+    parse_if_match,
+    set_validators,
+)
 from app.db.session import get_db
-from app.models.user import User
+from app.schemas.auth import CurrentUser
 from app.schemas.entry import (
+    BulkImportResponse,
     EntryCreate,
     EntryListResponse,
     EntryResponse,
+    EntrySummaryListResponse,
     EntryUpdate,
+    EntryView,
+    SearchMode,
+    TotalMode,
 )
 from app.services.auth_service import get_current_user
 from app.services.entry_service import (
+    bulk_create_entries,
     create_entry,
     delete_entry,
-    get_entry_by_id,
+    get_data_version,
+    get_entry_version,
     list_entries,
     list_user_tags,
+    read_entry,
     update_entry,
 )
+from app.services.export_service import EXPORT_FILES, ExportFormat, export_entries
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 
+_NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[object]:
+    """Yield one decoded object per non-blank line of a streamed NDJSON body."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buffer.strip():
+        yield _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> object:
+    """Decode one NDJSON line, passing undecodable lines through for validation."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace")
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[object]:
+    """Yield the items of a JSON array body. Raises 400 for anything else."""
+    try:
+        body = await request.json()
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Body is not valid JSON"
+        ) from exc
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of entries"
+        )
+    for item in body:
+        yield item
+
 
 @router.post("", response_model=EntryResponse, status_code=201)
 async def create(
     data: EntryCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new journal entry."""
@@ -38,64 +97,171 @@ async def create(
     return entry
 
 
-@router.get("", response_model=EntryListResponse)
+@router.post("/bulk", response_model=BulkImportResponse)
+async def create_bulk(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Import many entries at once.
+
+    Send a JSON array of entry objects (``application/json``) or one entry
+    object per line (``application/x-ndjson``, read as a stream). Each item
+    has the same shape as ``POST /entries``; invalid items are reported in
+    ``results`` without aborting the rest of the import.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    items = _iter_ndjson(request) if content_type in _NDJSON_TYPES else _iter_json_array(request)
+    return await bulk_create_entries(items, current_user.id, db)
+
+
+@router.get("", response_model=EntryListResponse | EntrySummaryListResponse)
 async def list_all(
+    response: Response,
     date: date | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
     tag: str | None = Query(None, description="Filter by tag name"),
     search: str | None = Query(None, description="Search title and content"),
+    search_mode: SearchMode = Query(
+        "substring",
+        description=(
+            "'substring' (case-insensitive match of partial words, the default), "
+            "'fulltext' (ranked, highlighted) or 'trigram' (partial words, typo-tolerant)"
+        ),
+    ),
     offset: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(
+        None, description="Opaque next_cursor from a previous page; supersedes offset"
+    ),
+    total: TotalMode = Query(
+        "exact",
+        description="'exact', 'estimate' (maintained counter when unfiltered) or 'none' (skip)",
+    ),
+    view: EntryView = Query(
+        "full", description="'summary' returns excerpts, tag names and counts only"
+    ),
+    if_none_match: str | None = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List journal entries with optional filters."""
-    entries, total = await list_entries(
+    """List journal entries with optional filters.
+
+    Answers ``304`` if nothing of the user's changed since the ``If-None-Match`` ETag.
+    """
+    # Read the version before the data: a write in between can only make the tag older.
+    etag = data_etag(current_user.id, await get_data_version(current_user.id, db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+
+    entries, count, next_cursor = await list_entries(
         user_id=current_user.id,
         db=db,
         date_filter=str(date) if date else None,
         tag_filter=tag,
         search_filter=search,
+        search_mode=search_mode,
         offset=offset,
         limit=limit,
+        cursor=cursor,
+        total_mode=total,
+        view=view,
+    )
+    if view == "summary":
+        return EntrySummaryListResponse(entries=entries, total=count, next_cursor=next_cursor)
+    return EntryListResponse(entries=entries, total=count, next_cursor=next_cursor)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    export_format: ExportFormat = Query(
+        "ndjson",
+        alias="format",
+        description="'ndjson' (gzip-compressed, one entry per line) or 'markdown-zip'",
+    ),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download every entry with its tags, links and attachment metadata.
+
+    The archive is streamed from a server-side cursor as rows arrive.
+    """
+    media_type, file_name = EXPORT_FILES[export_format]
+    return StreamingResponse(
+        export_entries(current_user.id, db, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
     )
-    return EntryListResponse(entries=entries, total=total)
 
 
 @router.get("/tags", response_model=list[str])
 async def list_tags(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    q: str | None = Query(None, description="Only tags containing or resembling this text"),
+    if_none_match: str | None = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Return all distinct tag names used by the current user."""
-    return await list_user_tags(current_user.id, db)
+    etag = data_etag(current_user.id, await get_data_version(current_user.id, db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    return await list_user_tags(current_user.id, db, query=q)
+
+
+def _expected_version(if_match: str | None) -> int | None:
+    """Entry version demanded by ``If-Match``; an unusable tag can never match (412)."""
+    try:
+        return parse_if_match(if_match)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(exc)
+        ) from None
 
 
 @router.get("/{entry_id}", response_model=EntryResponse)
 async def get_one(
     entry_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get a single journal entry by ID."""
-    return await get_entry_by_id(entry_id, current_user.id, db)
+    """Get a single journal entry by ID. The ETag header carries its version."""
+    if if_none_match is not None:
+        # Revalidation costs one primary-key lookup instead of the full aggregate load.
+        version = await get_entry_version(entry_id, current_user.id, db)
+        if version is not None and etag_matches(if_none_match, entry_etag(version)):
+            return not_modified(entry_etag(version))
+    entry = await read_entry(entry_id, current_user.id, db)
+    set_validators(response, entry_etag(entry["version"]))
+    return entry
 
 
 @router.put("/{entry_id}", response_model=EntryResponse)
 async def update(
     entry_id: uuid.UUID,
     data: EntryUpdate,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_match: str | None = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Update a journal entry."""
-    return await update_entry(entry_id, data, current_user.id, db)
+    """Update a journal entry. With ``If-Match``, only if its version is unchanged."""
+    entry = await update_entry(
+        entry_id, data, current_user.id, db, expected_version=_expected_version(if_match)
+    )
+    response.headers["ETag"] = entry_etag(entry.version)
+    return entry
 
 
 @router.delete("/{entry_id}", status_code=204)
 async def remove(
     entry_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    if_match: str | None = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Delete a journal entry."""
-    await delete_entry(entry_id, current_user.id, db)
+    """Delete a journal entry. With ``If-Match``, only if its version is unchanged."""
+    await delete_entry(entry_id, current_user.id, db, expected_version=_expected_version(if_match))
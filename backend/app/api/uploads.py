@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, File, Form, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.models.user import User
+from app.schemas.auth import CurrentUser
 from app.schemas.entry import AttachmentResponse
 from app.services.auth_service import get_current_user
 from app.services.upload_service import (
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/uploads", tags=["uploads"])
 async def upload(
     entry_id: uuid.UUID = Form(...),
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Upload a file and attach it to a journal entry."""
@@ -32,7 +32,7 @@ async def upload(
 @router.get("/{attachment_id}/url")
 async def get_download_url(
     attachment_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Return a short-lived pre-signed download URL for an attachment."""
@@ -43,7 +43,7 @@ async def get_download_url(
 @router.delete("/{attachment_id}", status_code=204)
 async def remove(
     attachment_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete an attachment (removes file from B2 and DB row)."""
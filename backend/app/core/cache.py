@@ -2,85 +2,530 @@
 
 Designed for caching analytics results that don't change every second.
 Each entry is keyed by an arbitrary hashable key and expires after *ttl* seconds.
+
+The cache is bounded: past *max_entries* keys or *max_bytes* of (estimated)
+value size the least recently used entries are evicted. Expired entries are
+swept out at most every *sweep_interval* seconds, on writes, so keys that are
+never read again do not linger. Keys whose second element is a user id are
+indexed per user, so a per-user invalidation touches only that user's keys.
+
+``get_or_compute`` coalesces concurrent misses: one computation per key is
+in flight at a time and every caller awaits it (single-flight). With a
+*soft_ttl* shorter than *ttl* it also serves stale-while-revalidate: past
+the soft TTL the cached value is returned at once and refreshed in a
+background task; past the hard *ttl*, or once invalidated, it is recomputed
+while the caller waits.
+
+The in-process store can be backed by a shared second tier (``SharedBackend``,
+selected by ``CACHE_BACKEND``): a local miss asks it before computing, and
+computed values are written to it, so N workers compute a value once. Values
+cross it in a compact serialised form (``encode_value`` / ``decode_value``).
+
+Service functions are cached declaratively with ``@cached``: the key comes
+from the call's arguments and each entry carries dependency tags such as
+``user:{user_id}:entries``, which mutation paths invalidate by name
+(``invalidate_tags``) across every cache in the process.
 """
 
 from __future__ import annotations
 
+import asyncio
+import datetime as _dt
+import functools
+import inspect
+import json
+import sys
 import time
-from typing import Any
+import uuid
+import weakref
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Protocol
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import async_session
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+logger = get_logger("cache")
+
+# Payloads above this many bytes are stored zlib-compressed.
+_COMPRESS_ABOVE = 512
+
+# True while a computation runs as a stale value's background refresh: the
+# caller that triggered it has been answered already and may be gone.
+refreshing: ContextVar[bool] = ContextVar("refreshing", default=False)
+
+
+# ------------------------------------------------------------------ shared tier
+
+
+def _tag(value: Any) -> Any:
+    # datetime before date: it is a subclass
+    if isinstance(value, _dt.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, _dt.date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"$u": str(value)}
+    raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+
+def _untag(obj: dict) -> Any:
+    if len(obj) == 1:
+        ((tag, raw),) = obj.items()
+        if tag == "$d":
+            return _dt.date.fromisoformat(raw)
+        if tag == "$dt":
+            return _dt.datetime.fromisoformat(raw)
+        if tag == "$u":
+            return uuid.UUID(raw)
+    return obj
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialise a cached value (JSON types plus dates and UUIDs) compactly."""
+    raw = json.dumps(value, separators=(",", ":"), default=_tag).encode()
+    if len(raw) > _COMPRESS_ABOVE:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_value(payload: bytes) -> Any:
+    """Inverse of ``encode_value``."""
+    raw = zlib.decompress(payload[1:]) if payload[:1] == b"z" else payload[1:]
+    return json.loads(raw, object_hook=_untag)
+
+
+class SharedBackend(Protocol):
+    """A cache tier shared by every worker, keyed like ``TTLCache``.
+
+    ``get`` returns ``(token, payload)``: the payload if a still-valid one is
+    stored, and a token describing the data it was looked up against.
+    ``set`` stores a payload computed after that lookup under the same token,
+    so a backend can reject entries computed from data that has since
+    changed.
+    """
+
+    async def get(self, key: tuple) -> tuple[Any, bytes | None]: ...
+
+    async def set(self, key: tuple, token: Any, payload: bytes, ttl: int) -> None: ...
+
+
+class MemoryBackend:
+    """In-process ``SharedBackend``: a stand-in for tests and single-worker runs.
+
+    Its token is a per-user generation, bumped by ``invalidate_for_user``.
+    """
+
+    def __init__(self) -> None:
+        self._store: dict[tuple, tuple[float, int, bytes]] = {}
+        self._generations: dict[Any, int] = {}
+
+    async def get(self, key: tuple) -> tuple[Any, bytes | None]:
+        generation = self._generations.get(key[1], 0)
+        entry = self._store.get(key)
+        if entry is None or entry[1] != generation or time.monotonic() > entry[0]:
+            return generation, None
+        return generation, entry[2]
+
+    async def set(self, key: tuple, token: Any, payload: bytes, ttl: int) -> None:
+        self._store[key] = (time.monotonic() + ttl, token, payload)
+
+    def invalidate_for_user(self, user_id: Any) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+# ------------------------------------------------------------------ local tier
+
+
+def _sizeof(value: Any) -> int:
+    """Rough deep size of a cached value in bytes (containers and scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    elif isinstance(value, list | tuple | set | frozenset):
+        size += sum(_sizeof(item) for item in value)
+    return size
 
 
 class TTLCache:
-    """Simple dict-backed cache with per-entry expiration.
+    """Bounded LRU cache with per-entry expiration.
 
     Usage::
 
-        _cache = TTLCache(ttl=60)
+        _cache = TTLCache(ttl=60, max_entries=10_000)  # shared=... for a second tier
 
         async def get_data(user_id, db):
             key = ("heatmap", user_id, start, end)
-            cached = _cache.get(key)
-            if cached is not None:
-                return cached
-            result = await _expensive_query(...)
-            _cache.set(key, result)
-            return result
+            return await _cache.get_or_compute(key, lambda: _expensive_query(...))
 
         # After a mutation (create/update/delete entry):
-        _cache.invalidate_prefix(("heatmap", user_id))
+        _cache.invalidate_for_user(user_id)
+
+    Prefer the ``@cached`` decorator for service functions.
     """
 
-    def __init__(self, ttl: int = 60) -> None:
+    def __init__(
+        self,
+        ttl: int = 60,
+        soft_ttl: int | None = None,
+        max_entries: int = 10_000,
+        max_bytes: int | None = None,
+        sweep_interval: float = 30.0,
+        shared: SharedBackend | None = None,
+    ) -> None:
         self._ttl = ttl
-        self._store: dict[tuple, tuple[float, Any]] = {}
+        self._soft_ttl = ttl if soft_ttl is None else min(soft_ttl, ttl)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self.shared = shared
+        # key -> (stale_at, expires_at, size, value), least recently used first
+        self._store: OrderedDict[tuple, tuple[float, float, int, Any]] = OrderedDict()
+        # key -> expires_at, soonest first: with one TTL, write order is expiry order
+        self._expiry: OrderedDict[tuple, float] = OrderedDict()
+        self._by_user: dict[Any, set[tuple]] = {}
+        self._key_tags: dict[tuple, tuple[str, ...]] = {}
+        self._by_tag: dict[str, set[tuple]] = {}
+        # key -> (computation, its dependency tags, its TTL override)
+        self._inflight: dict[tuple, tuple[asyncio.Future, tuple[str, ...], int | None]] = {}
+        self._bytes = 0
+        self._next_sweep = time.monotonic() + sweep_interval
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     # ---------------------------------------------------------------- read
 
     def get(self, key: tuple) -> Any | None:
-        """Return cached value or *None* if missing / expired."""
+        """Return cached value (stale or not) or *None* if missing / expired."""
+        entry = self._lookup(key, time.monotonic())
+        return None if entry is None else entry[3]
+
+    async def get_or_compute(
+        self,
+        key: tuple,
+        compute: Callable[[], Awaitable[Any]],
+        tags: tuple[str, ...] = (),
+        ttl: int | None = None,
+    ) -> Any:
+        """Return the cached value, or await ``compute()`` and cache its result
+        under the dependency *tags* (for *ttl* seconds instead of the cache's).
+
+        Concurrent callers missing the same key share one computation. Its
+        exception reaches every one of them and nothing is cached; a caller
+        being cancelled does not cancel it for the others. If the key is
+        invalidated while the computation runs, its result is still returned
+        to those already waiting but not cached, and later callers start over.
+        ``compute()`` may use the resources of the caller that started it (e.g.
+        its DB session); if that caller goes away first, the error reaches the
+        others, who can retry.
+
+        A value past the soft TTL is returned as is while ``compute()``
+        replaces it in the background, with ``refreshing`` set: by then the
+        caller has its answer, so a refresh must not use its resources. A failed refresh is logged and leaves the
+        stale value.
+        """
+        now = time.monotonic()
+        entry = self._lookup(key, now)
+        if entry is not None:
+            if now > entry[0] and key not in self._inflight:
+                self._start(key, compute, tags, ttl, background=True)
+            return entry[3]
+        inflight = self._inflight.get(key)
+        task = inflight[0] if inflight is not None else self._start(key, compute, tags, ttl)
+        return await asyncio.shield(task)
+
+    def _lookup(self, key: tuple, now: float) -> tuple[float, float, int, Any] | None:
         entry = self._store.get(key)
         if entry is None:
             return None
-        expires_at, value = entry
-        if time.monotonic() > expires_at:
-            del self._store[key]
+        if now > entry[1]:
+            self._remove(key)
             return None
+        self._store.move_to_end(key)
+        return entry
+
+    async def _load(
+        self, key: tuple, compute: Callable[[], Awaitable[Any]], ttl: int | None
+    ) -> Any:
+        """Ask the shared tier for *key* before computing it, then fill it in.
+
+        Only per-user keys are shared. A shared tier that fails is logged and
+        bypassed rather than failing the read.
+        """
+        shared = self.shared
+        if shared is None or len(key) < 2:
+            return await compute()
+        try:
+            token, payload = await shared.get(key)
+        except Exception as exc:
+            logger.warning("Shared cache read of %s failed: %r", key[:1], exc)
+            return await compute()
+        if payload is not None:
+            return decode_value(payload)
+
+        value = await compute()
+        if value is not None:
+            try:
+                await shared.set(key, token, encode_value(value), ttl or self._ttl)
+            except Exception as exc:
+                logger.warning("Shared cache write of %s failed: %r", key[:1], exc)
         return value
 
+    def _start(
+        self,
+        key: tuple,
+        compute: Callable[[], Awaitable[Any]],
+        tags: tuple[str, ...],
+        ttl: int | None,
+        background: bool = False,
+    ) -> asyncio.Future:
+        # The task copies the current context, and with it this flag.
+        token = refreshing.set(background)
+        try:
+            task = asyncio.ensure_future(self._load(key, compute, ttl))
+        finally:
+            refreshing.reset(token)
+        self._inflight[key] = (task, tags, ttl)
+        task.add_done_callback(lambda done: self._finish(key, done, background))
+        return task
+
+    def _finish(self, key: tuple, task: asyncio.Future, background: bool) -> None:
+        error = None if task.cancelled() else task.exception()
+        if background and error is not None:
+            logger.warning("Background refresh of %s failed: %r", key[:1], error)
+        inflight = self._inflight.get(key)
+        if inflight is None or inflight[0] is not task:
+            return  # invalidated while running
+        del self._inflight[key]
+        if not task.cancelled() and error is None:
+            self.set(key, task.result(), inflight[1], inflight[2])
+
     # ---------------------------------------------------------------- write
 
-    def set(self, key: tuple, value: Any) -> None:
-        """Store *value* under *key* with the configured TTL."""
-        self._store[key] = (time.monotonic() + self._ttl, value)
+    def set(
+        self, key: tuple, value: Any, tags: tuple[str, ...] = (), ttl: int | None = None
+    ) -> None:
+        """Store *value* under *key* with dependency *tags*, for *ttl* seconds if
+        given (the soft TTL is capped to it) or else the configured TTLs.
+
+        Sweeps go in write order, so with mixed TTLs an expired entry can
+        outstay its TTL in memory until older entries expire; it is never
+        returned after expiry.
+        """
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        self._remove(key)
+        size = _sizeof(value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            return  # would evict everything else and still not fit
+        if ttl is None:
+            stale_at, expires_at = now + self._soft_ttl, now + self._ttl
+        else:
+            stale_at, expires_at = now + min(self._soft_ttl, ttl), now + ttl
+        self._store[key] = (stale_at, expires_at, size, value)
+        self._expiry[key] = expires_at
+        self._bytes += size
+        if len(key) >= 2:
+            self._by_user.setdefault(key[1], set()).add(key)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+
+        while len(self._store) > self._max_entries or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            self._remove(next(iter(self._store)))
 
     # ---------------------------------------------------------------- invalidate
 
     def invalidate(self, key: tuple) -> None:
         """Remove a single key."""
-        self._store.pop(key, None)
+        self._inflight.pop(key, None)
+        self._remove(key)
 
     def invalidate_prefix(self, prefix: tuple) -> None:
         """Remove every key that starts with *prefix*.
 
-        Useful to bust all cache entries for a given user, e.g.::
+        Useful to bust one kind of entry for a given user, e.g.::
 
             cache.invalidate_prefix(("heatmap", user_id))
-            cache.invalidate_prefix(("summary", user_id))
+
+        Prefixes of two or more elements only look at that user's keys.
         """
-        to_delete = [k for k in self._store if k[: len(prefix)] == prefix]
-        for k in to_delete:
-            del self._store[k]
+        candidates = self._by_user.get(prefix[1], ()) if len(prefix) >= 2 else list(self._store)
+        for k in [k for k in candidates if k[: len(prefix)] == prefix]:
+            self._remove(k)
+        for k in [k for k in self._inflight if k[: len(prefix)] == prefix]:
+            del self._inflight[k]
 
     def invalidate_for_user(self, user_id: Any) -> None:
         """Remove *all* cached entries where the second key element is *user_id*."""
-        to_delete = [k for k in self._store if len(k) >= 2 and k[1] == user_id]
-        for k in to_delete:
-            del self._store[k]
+        for k in list(self._by_user.get(user_id, ())):
+            self._remove(k)
+        # In-flight keys are bounded by concurrent requests, not cache size.
+        for k in [k for k in self._inflight if len(k) >= 2 and k[1] == user_id]:
+            del self._inflight[k]
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """Remove every entry, cached or in flight, that depends on any of *tags*."""
+        for tag in tags:
+            for k in list(self._by_tag.get(tag, ())):
+                self._remove(k)
+        doomed = set(tags)
+        for k in [k for k, (_, deps, _) in self._inflight.items() if doomed.intersection(deps)]:
+            del self._inflight[k]
 
     def clear(self) -> None:
         """Drop everything."""
+        self._inflight.clear()
         self._store.clear()
+        self._expiry.clear()
+        self._by_user.clear()
+        self._key_tags.clear()
+        self._by_tag.clear()
+        self._bytes = 0
+
+    # ---------------------------------------------------------------- upkeep
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop expired entries, oldest write first, and return how many were
+        dropped. Stops at the first live one, which with per-entry TTLs may
+        leave shorter-lived entries written after it for a later sweep."""
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self._sweep_interval
+        dropped = 0
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            dropped += 1
+        return dropped
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._store.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        del self._expiry[key]
+        if len(key) >= 2:
+            user_keys = self._by_user.get(key[1])
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._by_user[key[1]]
+        for tag in self._key_tags.pop(key, ()):
+            tag_keys = self._by_tag[tag]
+            tag_keys.discard(key)
+            if not tag_keys:
+                del self._by_tag[tag]
+
+
+# Every TTLCache in the process, for invalidations that span them all.
+_caches: weakref.WeakSet[TTLCache] = weakref.WeakSet()
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop entries depending on any of *tags* from every cache in this process."""
+    for cache in list(_caches):
+        cache.invalidate_tags(*tags)
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Drop every entry keyed by *user_id* from every cache in this process."""
+    for cache in list(_caches):
+        cache.invalidate_for_user(user_id)
+
+
+def clear_all() -> None:
+    """Empty every cache in this process."""
+    for cache in list(_caches):
+        cache.clear()
+
+
+def user_tag(user_id: Any, kind: str) -> str:
+    """Dependency tag for one kind of a user's data, e.g. ``user:<id>:entries``."""
+    return f"user:{user_id}:{kind}"
+
+
+def cached(
+    namespace: str,
+    *,
+    cache: TTLCache,
+    tags: Sequence[str] = (),
+    key: Sequence[str] | None = None,
+    ttl: int | None = None,
+) -> Callable:
+    """Cache an async service function in *cache*.
+
+    The cache key is ``(namespace, *arguments)``, taking the parameters named
+    in *key* (default: all but ``db``, in signature order), so put the user id
+    first to make the key per-user. *tags* are format strings over the bound
+    arguments, e.g. ``"user:{user_id}:entries"``; mutations invalidate them
+    with ``invalidate_tags``. *ttl* overrides the cache's TTL for this
+    function's entries. Concurrent callers share one computation, which
+    runs on the ``db`` session of the caller that started it; a background
+    refresh, which outlives its caller, runs on a session of its own.
+    """
+
+    def decorate(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+        key_params = (
+            tuple(key)
+            if key is not None
+            else tuple(name for name in signature.parameters if name != "db")
+        )
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+
+            async def compute() -> Any:
+                if "db" not in arguments or not refreshing.get():
+                    return await func(**arguments)
+                async with async_session() as db:
+                    return await func(**{**arguments, "db": db})
+
+            return await cache.get_or_compute(
+                (namespace, *(arguments[name] for name in key_params)),
+                compute,
+                tags=tuple(tag.format(**arguments) for tag in tags),
+                ttl=ttl,
+            )
+
+        return wrapper
+
+    return decorate
+
+
+# Shared instance; TTLs default to 60 s with stale-while-revalidate off.
+analytics_cache = TTLCache(
+    ttl=settings.ANALYTICS_CACHE_TTL,
+    soft_ttl=settings.ANALYTICS_CACHE_SOFT_TTL,
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    max_bytes=settings.ANALYTICS_CACHE_MAX_BYTES,
+)
 
+# Hot per-user lookups (tag lists, single entries), evicted by tag on writes.
+lookup_cache = TTLCache(
+    ttl=settings.LOOKUP_CACHE_TTL,
+    max_entries=settings.LOOKUP_CACHE_MAX_ENTRIES,
+)
 
-# Shared instance — 60-second TTL is a good default for analytics.
-analytics_cache = TTLCache(ttl=60)
+# Authenticated principals by token signature, evicted by the "auth" user tag.
+principal_cache = TTLCache(
+    ttl=settings.AUTH_CACHE_TTL,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+)
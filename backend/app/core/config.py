@@ -1,7 +1,14 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
+# How /analytics/summary is computed: the maintained user_stats row, one CTE
+# statement, the four metric queries fanned out over pooled connections (at
+# most ANALYTICS_SUMMARY_CONNECTIONS per worker at once), or the four queries
+# one after another on the request's session.
+SummaryMode = Literal["stats", "single", "concurrent", "serial"]
+
 
 class Settings(BaseSettings):
     # Database
@@ -16,6 +23,17 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRY_DAYS: int = 7
+    # Seconds between reloads of the token revocation set: how long other
+    # workers may still accept a token revoked by a password change or deletion
+    AUTH_REVOCATION_REFRESH: int = 30
+
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int | None = None  # bcrypt threads; the CPU count if unset
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # hashes waiting for a thread before requests get 503
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost; hashes stored at another cost are redone on login
+    # If set, calibrate the cost at startup: the highest whose hash takes at most this many ms.
+    # Each worker calibrates on its own, so pin PASSWORD_HASH_ROUNDS when running several.
+    PASSWORD_HASH_TARGET_MS: int | None = None
 
     # Backblaze B2
     B2_KEY_ID: str
@@ -23,6 +41,38 @@ class Settings(BaseSettings):
     B2_BUCKET_NAME: str
     B2_ENDPOINT_URL: str
 
+    # Search
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.3  # pg_trgm cut-off for search_mode=trigram
+
+    # Bulk import / export
+    BULK_IMPORT_BATCH_SIZE: int = 500  # entries per set-based insert round
+    EXPORT_BATCH_SIZE: int = 200  # rows fetched per server-side cursor round trip
+
+    # Analytics
+    ANALYTICS_SUMMARY_MODE: SummaryMode = "stats"
+    # Pooled connections the "concurrent" mode may hold at once, per worker,
+    # on top of each request's own. The pool is 5 + 10 overflow: keep this
+    # well under that, or cold summaries starve every other request.
+    ANALYTICS_SUMMARY_CONNECTIONS: int = 4
+
+    # Caching
+    ANALYTICS_CACHE_TTL: int = 60  # hard TTL: older values are recomputed while the caller waits
+    # Soft TTL: older values are served stale and refreshed in the background (off if unset)
+    ANALYTICS_CACHE_SOFT_TTL: int | None = None
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 10_000  # LRU bound of the per-worker cache
+    ANALYTICS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # estimated size of cached values
+    # Summaries also move with the calendar: a summary cached without an explicit
+    # date (see get_summary) must not outlive midnight by much
+    ANALYTICS_SUMMARY_CACHE_TTL: int = 30
+    LOOKUP_CACHE_TTL: int = 300  # cached tag lists / entries, evicted by writes on every worker
+    LOOKUP_CACHE_MAX_ENTRIES: int = 10_000
+    AUTH_CACHE_TTL: int = 30  # resolved principal per token; password change / deletion evict it
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    # "postgres" puts the shared UNLOGGED shared_cache table behind each worker's cache
+    CACHE_BACKEND: Literal["memory", "postgres"] = "memory"
+    # Publish writes' cache invalidations to every worker via LISTEN / NOTIFY
+    CACHE_INVALIDATION_NOTIFY: bool = True
+
     # App
     CORS_ORIGINS: str = "http://localhost:3000"
     ENV: str = "development"  # set to "production" in prod
@@ -0,0 +1,78 @@
+"""Entity tags for conditional requests.
+
+Single entries carry their ``version`` column as a strong tag (``"3"``).
+Clients send it back in ``If-Match`` so a write only applies to the version
+they read, or in ``If-None-Match`` to revalidate a cached copy.
+
+User-scoped reads (lists, tags, analytics) carry a weak tag derived from the
+user's data version, which every entry / tag / attachment write bumps, so a
+poll that finds nothing changed is answered with ``304 Not Modified``.
+"""
+
+import re
+import uuid
+
+from fastapi import Response, status
+
+_STRONG_ETAG = re.compile(r'^"(\d+)"$')
+
+# Let browsers keep the body but revalidate it on every use.
+CACHE_CONTROL = "private, no-cache"
+
+
+def entry_etag(version: int) -> str:
+    """Return the strong ETag for an entry version."""
+    return f'"{version}"'
+
+
+def data_etag(user_id: uuid.UUID, data_version: int, *qualifiers: object) -> str:
+    """Return the weak ETag for a read of the user's data at *data_version*.
+
+    The user id keeps tags distinct across accounts sharing a browser cache;
+    *qualifiers* cover anything else the response depends on (e.g. today's date).
+    """
+    tag = ".".join([user_id.hex, str(data_version), *(str(q) for q in qualifiers)])
+    return f'W/"{tag}"'
+
+
+def parse_if_match(header: str | None) -> int | None:
+    """Return the entry version required by an ``If-Match`` header.
+
+    Returns None when the header is absent or ``*`` (no precondition). Raises
+    ``ValueError`` for anything :func:`entry_etag` cannot have produced; such a
+    tag can never match, so callers answer 412.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    match = _STRONG_ETAG.match(header.strip())
+    if match is None:
+        raise ValueError("If-Match must be a single strong entry ETag")
+    return int(match.group(1))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True if an ``If-None-Match`` header matches *etag* (weak comparison)."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def set_validators(response: Response, etag: str) -> None:
+    """Attach *etag* and the revalidation policy to a 200 response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Bodiless 304 telling the client its cached copy (*etag*) is current."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,145 @@
+"""Cross-worker cache invalidation over Postgres LISTEN / NOTIFY.
+
+Every worker keeps its own in-process caches. A write publishes the
+dependency tags it made stale (see ``app.core.cache.cached``) with
+``pg_notify`` inside its own transaction, so Postgres delivers the
+notification only once the write commits (and never if it rolls back). Each
+worker runs an ``InvalidationListener`` on a dedicated connection that evicts
+those tags locally. The writing worker also evicts them itself, right after
+the commit, not before it: a read missing in between would otherwise cache
+pre-commit data again. A payload is space-separated tags; a bare user id
+stands for everything cached for that user.
+
+LISTEN needs a session-level connection: ``DB_HOST`` must be a direct
+endpoint, not a transaction-pooling proxy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import uuid
+from typing import TYPE_CHECKING
+
+import asyncpg
+from sqlalchemy import func, select
+
+from app.core.cache import invalidate_tags
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import on_commit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = get_logger("invalidation")
+
+CHANNEL = "growthgrid_cache_invalidation"
+
+# Seconds between liveness probes of the listening connection.
+_KEEPALIVE_INTERVAL = 30.0
+_MAX_RECONNECT_DELAY = 60.0
+
+
+async def invalidate(db: AsyncSession, *tags: str) -> None:
+    """Evict *tags* from every worker's caches once *db*'s transaction commits."""
+    on_commit(db, functools.partial(invalidate_tags, *tags))
+    if settings.CACHE_INVALIDATION_NOTIFY and tags:
+        await db.execute(select(func.pg_notify(CHANNEL, " ".join(tags))))
+
+
+class InvalidationListener:
+    """Listen on ``CHANNEL``; hand notified tags to *on_tags* and bare user
+    ids to *on_user*.
+
+    Notifications sent while the connection is down are lost, so *on_reset*
+    (drop everything) runs each time it is (re)established. The connection
+    is probed every ``_KEEPALIVE_INTERVAL`` seconds and reopened with
+    exponential backoff when it fails.
+    """
+
+    def __init__(
+        self,
+        on_user: Callable[[uuid.UUID], None],
+        on_tags: Callable[..., None],
+        on_reset: Callable[[], None],
+    ) -> None:
+        self._on_user = on_user
+        self._on_tags = on_tags
+        self._on_reset = on_reset
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if settings.CACHE_INVALIDATION_NOTIFY and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._on_exit)
+
+    @staticmethod
+    def _on_exit(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Invalidation listener stopped; this worker no longer sees other workers' writes",
+                exc_info=task.exception(),
+            )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _notify(self, _conn, _pid: int, _channel: str, payload: str) -> None:
+        tags = []
+        for token in payload.split():
+            if token.startswith("user:"):
+                tags.append(token)
+                continue
+            try:
+                self._on_user(uuid.UUID(token))
+            except ValueError:
+                logger.warning("Ignoring malformed invalidation token %r", token)
+        if tags:
+            self._on_tags(*tags)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            # Any failure (connect, timeout, a callback raising) is logged and
+            # retried: if this loop died the worker would serve stale values.
+            try:
+                conn = await asyncpg.connect(
+                    host=settings.DB_HOST,
+                    user=settings.DB_USER,
+                    password=settings.DB_PASSWORD,
+                    database=settings.DB_DATABASE,
+                    ssl=settings.DB_SSLMODE,
+                )
+            except Exception as exc:
+                logger.warning(
+                    "Invalidation listener cannot connect (%r); retry in %.0fs", exc, delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+                continue
+
+            try:
+                await conn.add_listener(CHANNEL, self._notify)
+                self._on_reset()
+                logger.info("Listening for cache invalidations on %s", CHANNEL)
+                delay = 1.0
+                while True:
+                    await asyncio.sleep(_KEEPALIVE_INTERVAL)
+                    await conn.execute("SELECT 1", timeout=_KEEPALIVE_INTERVAL)
+            except Exception as exc:
+                logger.warning(
+                    "Invalidation listener lost its connection (%r); retry in %.0fs", exc, delay
+                )
+            finally:
+                with contextlib.suppress(Exception):
+                    await conn.close(timeout=5)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RECONNECT_DELAY)
@@ -0,0 +1,36 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor encodes the sort key of the last row on a page so the next page can
+be fetched with a ``WHERE (date, created_at, id) < (...)`` seek instead of an
+``OFFSET`` that makes Postgres walk and discard every earlier row.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+
+
+def encode_cursor(entry_date: date, created_at: datetime, entry_id: uuid.UUID) -> str:
+    """Return a URL-safe cursor for the given ``(date, created_at, id)`` key."""
+    raw = json.dumps([entry_date.isoformat(), created_at.isoformat(), str(entry_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, datetime, uuid.UUID]:
+    """Parse a cursor produced by :func:`encode_cursor`.
+
+    Raises ``ValueError`` if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_created_at, raw_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            date.fromisoformat(raw_date),
+            datetime.fromisoformat(raw_created_at),
+            uuid.UUID(raw_id),
+        )
+    except (TypeError, ValueError) as exc:  # binascii.Error / JSONDecodeError are ValueErrors
+        raise ValueError("Invalid pagination cursor") from exc
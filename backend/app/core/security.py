@@ -1,14 +1,163 @@
+from __future__ import annotations
+
 import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 import bcrypt
 import jwt
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class HashingPoolFullError(RuntimeError):
+    """Raised when the password hashing queue is full; answer 503 and retry later."""
+
+
+class HashingPool:
+    """Bounded executor dedicated to bcrypt.
+
+    bcrypt releases the GIL, so a thread per core keeps every core busy
+    without oversubscribing them, and a login burst cannot starve other
+    users of the default executor. At most ``max_queue`` calls wait behind
+    the running ones; further calls fail fast with ``HashingPoolFullError``.
+    ``stats()`` reports queue depth and smoothed wait / run latency.
+    """
+
+    # Weight of the newest sample in the latency averages.
+    _ALPHA = 0.1
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_ms = 0.0
+        self._run_ms = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the pool and return its result."""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolFullError("Password hashing queue is full")
+            self._in_flight += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+
+        submitted = time.perf_counter()
+
+        def timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        try:
+            future = self._executor.submit(timed)
+        except RuntimeError:  # shut down
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        # The slot is released when the thread finishes, even if the caller
+        # was cancelled while it ran.
+        return await asyncio.wrap_future(future)
+
+    def _record(self, wait: float, run: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            weight = 1.0 if self._completed == 1 else self._ALPHA
+            self._wait_ms += weight * (wait * 1000 - self._wait_ms)
+            self._run_ms += weight * (run * 1000 - self._run_ms)
+
+    def has_idle_worker(self) -> bool:
+        """Whether a call submitted now would start at once rather than queue."""
+        with self._lock:
+            return self._in_flight < self.workers
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.workers),
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_ms, 2),
+                "avg_run_ms": round(self._run_ms, 2),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
+# bcrypt cost of new hashes; see set_hash_rounds().
+_hash_rounds = settings.PASSWORD_HASH_ROUNDS
+
+# Bounds of calibrate_hash_rounds(): 10 is the lowest cost still considered safe.
+_MIN_ROUNDS = 10
+_MAX_ROUNDS = 16
+
+
+def set_hash_rounds(rounds: int) -> None:
+    """Use cost *rounds* for new hashes (and as the target of ``needs_rehash``)."""
+    global _hash_rounds
+    _hash_rounds = rounds
+
+
+def calibrate_hash_rounds(
+    target_ms: float, min_rounds: int = _MIN_ROUNDS, max_rounds: int = _MAX_ROUNDS
+) -> int:
+    """Return the highest cost in range whose hash takes at most *target_ms* here.
+
+    Blocks for about two hashes at *min_rounds*; each extra round doubles the
+    time, so the rest is extrapolated. Run it on ``hashing_pool``.
+    """
+    salt = bcrypt.gensalt(rounds=min_rounds)
+    elapsed = float("inf")
+    for _ in range(2):  # best of two, to discount a cold start
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", salt)
+        elapsed = min(elapsed, (time.perf_counter() - start) * 1000)
+
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 <= target_ms:
+        elapsed *= 2
+        rounds += 1
+    return rounds
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether *hashed_password* was made at a cost other than the current one."""
+    try:
+        return int(hashed_password.split("$")[2]) != _hash_rounds
+    except (IndexError, ValueError):
+        return False
+
 
 def _hash_password_sync(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=_hash_rounds)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
@@ -20,20 +169,21 @@ def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
 
 
 async def hash_password(password: str) -> str:
-    """Hash a plaintext password using bcrypt (runs in thread to avoid blocking)."""
-    return await asyncio.to_thread(_hash_password_sync, password)
+    """Hash a plaintext password using bcrypt (runs on ``hashing_pool``)."""
+    return await hashing_pool.run(_hash_password_sync, password)
 
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plaintext password against a bcrypt hash (runs in thread)."""
-    return await asyncio.to_thread(_verify_password_sync, plain_password, hashed_password)
+    """Verify a plaintext password against a bcrypt hash (runs on ``hashing_pool``)."""
+    return await hashing_pool.run(_verify_password_sync, plain_password, hashed_password)
 
 
-def create_access_token(user_id: str) -> str:
-    """Create a JWT access token with expiry."""
+def create_access_token(user_id: str, token_version: int = 0) -> str:
+    """Create a JWT access token with expiry and the user's token version."""
     expire = datetime.now(UTC) + timedelta(days=settings.JWT_EXPIRY_DAYS)
     payload = {
         "sub": user_id,
+        "ver": token_version,
         "exp": expire,
         "iat": datetime.now(UTC),
     }
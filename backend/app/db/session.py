@@ -1,8 +1,16 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("db")
+
+# Session.info key of the callbacks waiting for the transaction to commit.
+_ON_COMMIT = "on_commit"
 
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -25,3 +33,31 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
         except Exception:
             await session.rollback()
             raise
+
+
+def on_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run *callback* once *db*'s transaction commits; drop it if it rolls back.
+
+    For in-process side effects of a write (cache eviction, revocations) that
+    must not be seen before, or at all without, the write itself.
+    """
+    db.sync_session.info.setdefault(_ON_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a savepoint released; the transaction is still open
+    for callback in session.info.pop(_ON_COMMIT, ()):
+        try:
+            callback()
+        except Exception:
+            # The transaction is committed already; failing the request won't undo it.
+            logger.exception("on_commit callback %r failed", callback)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_on_commit(session: Session, transaction) -> None:
+    # Still pending when the outermost transaction ends: it was rolled back.
+    if transaction.parent is None:
+        session.info.pop(_ON_COMMIT, None)
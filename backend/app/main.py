@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 
 from fastapi import FastAPI, Request
@@ -11,20 +13,58 @@ from app.api.analytics import router as analytics_router
 from app.api.auth import router as auth_router
 from app.api.entries import router as entries_router
 from app.api.uploads import router as uploads_router
+from app.core.cache import analytics_cache, clear_all, invalidate_tags, invalidate_user
 from app.core.config import settings
+from app.core.invalidation import InvalidationListener
 from app.core.limiter import limiter
 from app.core.logging import get_logger, setup_logging
+from app.core.security import (
+    HashingPoolFullError,
+    calibrate_hash_rounds,
+    hashing_pool,
+    set_hash_rounds,
+)
 from app.services.health_service import build_health_report
+from app.services.shared_cache_service import PostgresBackend
+from app.services.token_revocation_service import revocations
 
 setup_logging()
 logger = get_logger("main")
 
 _APP_VERSION = "0.1.0"
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Calibrate the bcrypt cost if asked to, share cached analytics between
+    workers, keep this worker's copies in step with writes made by the others
+    and keep its token revocations loaded."""
+    if settings.PASSWORD_HASH_TARGET_MS is not None:
+        rounds = await hashing_pool.run(calibrate_hash_rounds, settings.PASSWORD_HASH_TARGET_MS)
+        set_hash_rounds(rounds)
+        logger.info(
+            "bcrypt cost calibrated to %d for a %d ms target",
+            rounds,
+            settings.PASSWORD_HASH_TARGET_MS,
+        )
+    if settings.CACHE_BACKEND == "postgres":
+        analytics_cache.shared = PostgresBackend()
+    listener = InvalidationListener(invalidate_user, invalidate_tags, clear_all)
+    await listener.start()
+    await revocations.start()
+    try:
+        yield
+    finally:
+        await revocations.stop()
+        await listener.stop()
+        hashing_pool.shutdown()
+
+
 app = FastAPI(
     title="GrowthGrid API",
     description="A personal learning journal API",
     version=_APP_VERSION,
+    lifespan=lifespan,
 )
 
 app.state.limiter = limiter
@@ -41,6 +81,17 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(HashingPoolFullError)
+async def hashing_pool_full_handler(request: Request, exc: HashingPoolFullError):
+    """Shed password hashing load with a fast 503 instead of queueing without bound."""
+    logger.warning("Password hashing queue full on %s %s", request.method, request.url.path)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """Catch-all for unhandled exceptions — log and return a 500."""
@@ -57,6 +108,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read entry versions for If-Match / If-None-Match.
+    expose_headers=["ETag"],
 )
 
 app.include_router(auth_router)
@@ -1,7 +1,22 @@
 from app.models.attachment import Attachment
 from app.models.entry import Entry
 from app.models.link import Link
+from app.models.shared_cache_entry import SharedCacheEntry
 from app.models.tag import Tag, entry_tags
+from app.models.token_revocation import TokenRevocation
 from app.models.user import User
+from app.models.user_daily_count import UserDailyCount
+from app.models.user_stats import UserStats
 
-__all__ = ["Attachment", "Entry", "Link", "Tag", "User", "entry_tags"]
+__all__ = [
+    "Attachment",
+    "Entry",
+    "Link",
+    "SharedCacheEntry",
+    "Tag",
+    "TokenRevocation",
+    "User",
+    "UserDailyCount",
+    "UserStats",
+    "entry_tags",
+]
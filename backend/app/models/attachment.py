@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -24,3 +24,5 @@ class Attachment(Base):
     )
 
     entry: Mapped["Entry"] = relationship(back_populates="attachments")  # noqa: F821
+
+    __table_args__ = (Index("ix_attachments_entry_id", "entry_id"),)
@@ -1,8 +1,9 @@
 import uuid
 from datetime import date, datetime
+from typing import ClassVar
 
-from sqlalchemy import Date, DateTime, ForeignKey, Index, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,10 +19,16 @@ class Entry(Base):
     date: Mapped[date] = mapped_column(Date, nullable=False)
     title: Mapped[str | None] = mapped_column(String(500), nullable=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Whitespace-collapsed head of content for list views, maintained by entry_repo.
+    excerpt: Mapped[str] = mapped_column(String(200), nullable=False, server_default="")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Bumped on every UPDATE; exposed as the entry's ETag for If-Match checks.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    # Weighted title (A) + content (B) document, maintained by entry_repo on write.
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     user: Mapped["User"] = relationship(back_populates="entries")  # noqa: F821
     tags: Mapped[list["Tag"]] = relationship(  # noqa: F821
@@ -34,7 +41,32 @@ class Entry(Base):
         back_populates="entry", cascade="all, delete-orphan"
     )
 
+    # Fetch server-generated created_at / updated_at with RETURNING on write; ORM
+    # flushes guard and bump ``version`` (UPDATE ... WHERE version = :loaded).
+    __mapper_args__: ClassVar[dict] = {"eager_defaults": True, "version_id_col": version}
+
     __table_args__ = (
         Index("ix_entries_date", "date"),
         Index("ix_entries_user_id", "user_id"),
+        # Backs the default (date, created_at, id) DESC listing and its keyset seek.
+        Index(
+            "ix_entries_user_date_created_id",
+            "user_id",
+            date.desc(),
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index("ix_entries_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_entries_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_entries_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
     )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -20,3 +20,5 @@ class Link(Base):
     url: Mapped[str] = mapped_column(String(2000), nullable=False)
 
     entry: Mapped["Entry"] = relationship(back_populates="links")  # noqa: F821
+
+    __table_args__ = (Index("ix_links_entry_id", "entry_id"),)
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Cross-worker L2 behind the in-process analytics cache (CACHE_BACKEND=postgres).
+# UNLOGGED: no WAL or replication and emptied after a crash, which a cache can
+# afford. A row is only served while data_version matches the user's.
+class SharedCacheEntry(Base):
+    __tablename__ = "shared_cache"
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    data_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_shared_cache_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
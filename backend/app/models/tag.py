@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, Index, String, Table, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -34,8 +34,20 @@ class Tag(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-
-    __table_args__ = (UniqueConstraint("name", "user_id", name="uq_tag_name_user"),)
+    # Number of the user's entries carrying this tag, maintained by stats_repo.
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    __table_args__ = (
+        UniqueConstraint("name", "user_id", name="uq_tag_name_user"),
+        # Most-used tag lookup for user_stats.top_tag
+        Index("ix_tags_user_entry_count", "user_id", entry_count.desc(), "name"),
+        Index(
+            "ix_tags_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     entries: Mapped[list["Entry"]] = relationship(  # noqa: F821
         secondary=entry_tags, back_populates="tags"
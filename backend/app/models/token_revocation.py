@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Access tokens of user_id with a ``ver`` claim below min_version are no
+# longer accepted. Once a row is older than the token lifetime it only covers
+# expired tokens and is purged. No foreign key: a deleted user's row must
+# outlive the user.
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    min_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (Index("ix_token_revocations_revoked_at", "revoked_at"),)
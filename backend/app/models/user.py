@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, String, func
+from sqlalchemy import DateTime, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -15,6 +15,8 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Carried by access tokens as ``ver``; bumping it revokes the older ones.
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     entries: Mapped[list["Entry"]] = relationship(  # noqa: F821
         back_populates="user", cascade="all, delete-orphan"
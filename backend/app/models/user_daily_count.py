@@ -0,0 +1,20 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Entries per (user, day) for the heatmap, maintained in the same transaction
+# as every entry write. analytics_service.verify_daily_counts checks it.
+class UserDailyCount(Base):
+    __tablename__ = "user_daily_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
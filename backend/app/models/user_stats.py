@@ -0,0 +1,30 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Per-user counters and dashboard summary, maintained in the same transaction as
+# every entry write (stats_repo.record_entry_changes), so /analytics/summary is
+# a primary-key read.
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_entries: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Bumped by every entry / tag / attachment write; the weak ETag of user-scoped reads.
+    data_version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    # {"YYYY-MM": entry count}
+    month_counts: Mapped[dict[str, int]] = mapped_column(JSONB, nullable=False, server_default="{}")
+    # Latest run of consecutive entry days. It is "current" only while
+    # streak_end >= yesterday, which readers check instead of rolling it over.
+    streak_end: Mapped[date | None] = mapped_column(Date, nullable=True)
+    streak_length: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    longest_streak: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    top_tag: Mapped[str | None] = mapped_column(String(100), nullable=True)
@@ -3,11 +3,13 @@
 import uuid
 from datetime import date
 
-from sqlalchemy import desc, func, select, text
+from sqlalchemy import Row, and_, delete, desc, func, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.entry import Entry
 from app.models.tag import Tag, entry_tags
+from app.models.user_daily_count import UserDailyCount
+from app.models.user_stats import UserStats
 
 
 async def get_heatmap_data(
@@ -19,18 +21,82 @@ async def get_heatmap_data(
     """Return [{date, count}] for every date the user has entries.
 
     Optionally filter to a date range [start_date, end_date] inclusive.
+    Reads the ``user_daily_counts`` rollup: a range scan of its primary key.
     """
-    stmt = select(Entry.date, func.count().label("count")).where(Entry.user_id == user_id)
+    stmt = select(UserDailyCount.date, UserDailyCount.count).where(
+        UserDailyCount.user_id == user_id, UserDailyCount.count > 0
+    )
     if start_date is not None:
-        stmt = stmt.where(Entry.date >= start_date)
+        stmt = stmt.where(UserDailyCount.date >= start_date)
     if end_date is not None:
-        stmt = stmt.where(Entry.date <= end_date)
-    stmt = stmt.group_by(Entry.date).order_by(Entry.date)
+        stmt = stmt.where(UserDailyCount.date <= end_date)
+    stmt = stmt.order_by(UserDailyCount.date)
 
     result = await db.execute(stmt)
     return [{"date": row.date, "count": row.count} for row in result.all()]
 
 
+def _daily_counts_from_entries(user_id: uuid.UUID | None):
+    """``(user_id, date, count)`` recomputed from entries — the rollup's source of truth."""
+    stmt = select(Entry.user_id, Entry.date, func.count().label("count")).group_by(
+        Entry.user_id, Entry.date
+    )
+    if user_id is not None:
+        stmt = stmt.where(Entry.user_id == user_id)
+    return stmt
+
+
+async def find_daily_count_drift(
+    db: AsyncSession,
+    user_id: uuid.UUID | None = None,
+) -> list[Row]:
+    """Return ``(user_id, date, expected, actual)`` for every rollup row that
+    disagrees with ``entries``, for one user or everyone."""
+    expected = _daily_counts_from_entries(user_id).subquery("expected")
+    actual = select(UserDailyCount).where(UserDailyCount.count != 0)
+    if user_id is not None:
+        actual = actual.where(UserDailyCount.user_id == user_id)
+    actual = actual.subquery("actual")
+
+    expected_count = func.coalesce(expected.c.count, 0)
+    actual_count = func.coalesce(actual.c.count, 0)
+    result = await db.execute(
+        select(
+            func.coalesce(expected.c.user_id, actual.c.user_id).label("user_id"),
+            func.coalesce(expected.c.date, actual.c.date).label("date"),
+            expected_count.label("expected"),
+            actual_count.label("actual"),
+        )
+        .select_from(
+            expected.join(
+                actual,
+                and_(expected.c.user_id == actual.c.user_id, expected.c.date == actual.c.date),
+                full=True,
+            )
+        )
+        .where(expected_count != actual_count)
+        .order_by("user_id", "date")
+    )
+    return list(result.all())
+
+
+async def rebuild_daily_counts(user_id: uuid.UUID, db: AsyncSession) -> None:
+    """Replace the user's rollup rows with counts recomputed from entries.
+
+    Entry writes update the user's ``user_stats`` row before touching the
+    rollup, so locking that row first serialises the rebuild with them.
+    """
+    await db.execute(
+        select(UserStats.user_id).where(UserStats.user_id == user_id).with_for_update()
+    )
+    await db.execute(delete(UserDailyCount).where(UserDailyCount.user_id == user_id))
+    await db.execute(
+        insert(UserDailyCount).from_select(
+            ["user_id", "date", "count"], _daily_counts_from_entries(user_id)
+        )
+    )
+
+
 async def get_total_entries(user_id: uuid.UUID, db: AsyncSession) -> int:
     """Return total entry count for the user."""
     result = await db.execute(
@@ -47,7 +113,7 @@ async def get_entries_since(user_id: uuid.UUID, since: date, db: AsyncSession) -
     return result.scalar_one()
 
 
-async def get_streaks(user_id: uuid.UUID, db: AsyncSession) -> tuple[int, int]:
+async def get_streaks(user_id: uuid.UUID, today: date, db: AsyncSession) -> tuple[int, int]:
     """Compute current and longest streaks entirely in SQL.
 
     Uses the "islands and gaps" window-function pattern:
@@ -55,7 +121,7 @@ async def get_streaks(user_id: uuid.UUID, db: AsyncSession) -> tuple[int, int]:
     2. Subtract a row-number offset so consecutive dates share the same group key.
     3. Count each group → streak length.
     4. Longest streak = MAX(streak_len).
-    5. Current streak = the streak whose last_date is today or yesterday.
+    5. Current streak = the streak whose last_date is *today* or yesterday.
 
     Returns (current_streak, longest_streak).
     """
@@ -81,26 +147,95 @@ async def get_streaks(user_id: uuid.UUID, db: AsyncSession) -> tuple[int, int]:
         SELECT
             COALESCE(MAX(streak_len), 0)::int AS longest_streak,
             COALESCE(
-                MAX(CASE WHEN last_date >= CURRENT_DATE - 1 THEN streak_len END),
+                MAX(CASE WHEN last_date >= CAST(:today AS date) - 1 THEN streak_len END),
                 0
             )::int AS current_streak
         FROM streaks
     """)
-    result = await db.execute(query, {"user_id": user_id})
+    result = await db.execute(query, {"user_id": user_id, "today": today})
     row = result.one()
     return row.current_streak, row.longest_streak
 
 
 async def get_most_used_tag(user_id: uuid.UUID, db: AsyncSession) -> str | None:
-    """Return the name of the most-used tag, or None if no tags exist."""
+    """Return the name of the most-used tag, or None if no tags exist.
+
+    Ties go to the first name alphabetically, as in every summary mode.
+    """
     result = await db.execute(
         select(Tag.name, func.count().label("cnt"))
         .join(entry_tags, Tag.id == entry_tags.c.tag_id)
         .join(Entry, Entry.id == entry_tags.c.entry_id)
         .where(Entry.user_id == user_id)
         .group_by(Tag.name)
-        .order_by(desc("cnt"))
+        .order_by(desc("cnt"), Tag.name)
         .limit(1)
     )
     row = result.first()
     return row[0] if row else None
+
+
+async def get_summary_metrics(
+    user_id: uuid.UUID, since: date, today: date, db: AsyncSession
+) -> Row:
+    """Compute every summary metric from entries in a single statement.
+
+    One round trip for what ``get_total_entries``, ``get_entries_since``,
+    ``get_streaks`` and ``get_most_used_tag`` do in four: the same queries as
+    CTEs over one pass of the user's entries. Returns a row with
+    ``total_entries``, ``entries_since``, ``current_streak``,
+    ``longest_streak`` and ``most_used_tag``.
+    """
+    query = text("""
+        WITH user_entries AS (
+            SELECT id, date
+            FROM entries
+            WHERE user_id = :user_id
+        ),
+        counts AS (
+            SELECT
+                COUNT(*)::int AS total_entries,
+                (COUNT(*) FILTER (WHERE date >= :since))::int AS entries_since
+            FROM user_entries
+        ),
+        grouped AS (
+            SELECT
+                d,
+                d - (ROW_NUMBER() OVER (ORDER BY d))::int AS grp
+            FROM (SELECT DISTINCT date AS d FROM user_entries) distinct_dates
+        ),
+        streaks AS (
+            SELECT
+                COUNT(*) AS streak_len,
+                MAX(d) AS last_date
+            FROM grouped
+            GROUP BY grp
+        ),
+        streak_totals AS (
+            SELECT
+                COALESCE(MAX(streak_len), 0)::int AS longest_streak,
+                COALESCE(
+                    MAX(CASE WHEN last_date >= CAST(:today AS date) - 1 THEN streak_len END),
+                    0
+                )::int AS current_streak
+            FROM streaks
+        ),
+        top_tag AS (
+            SELECT t.name
+            FROM user_entries e
+            JOIN entry_tags et ON et.entry_id = e.id
+            JOIN tags t ON t.id = et.tag_id
+            GROUP BY t.name
+            ORDER BY COUNT(*) DESC, t.name
+            LIMIT 1
+        )
+        SELECT
+            counts.total_entries,
+            counts.entries_since,
+            streak_totals.current_streak,
+            streak_totals.longest_streak,
+            (SELECT name FROM top_tag) AS most_used_tag
+        FROM counts, streak_totals
+    """)
+    result = await db.execute(query, {"user_id": user_id, "since": since, "today": today})
+    return result.one()
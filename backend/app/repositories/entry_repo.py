@@ -1,15 +1,63 @@
 """Entry repository — all entry/tag/link DB operations."""
 
 import uuid
+from collections.abc import AsyncIterator, Sequence
 from datetime import date as date_type
-
-from sqlalchemy import delete, distinct, func, select
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Row,
+    String,
+    Text,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from app.core.config import settings
+from app.models.attachment import Attachment
 from app.models.entry import Entry
 from app.models.link import Link
 from app.models.tag import Tag, entry_tags
+from app.models.user_stats import UserStats
+from app.schemas.entry import EntryView, SearchMode, TotalMode
+
+# Text-search configuration used both to build and to query entries.search_vector.
+FTS_CONFIG = "english"
+
+# ts_headline options for search snippets. The only markup in a snippet is
+# <mark>: it is built from HTML-escaped content (see _escaped_content).
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+
+def _escaped_content():
+    """``entries.content`` with ``& < > "`` replaced by HTML entities, so a
+    highlighted snippet is safe to render as HTML. The default text-search
+    parser keeps entities whole, so matching is unaffected."""
+    escaped = Entry.content
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;")):
+        escaped = func.replace(escaped, char, entity)
+    return escaped
+
+
+# Length of the stored plain-text excerpt shown by summary list views.
+EXCERPT_LENGTH = 200
 
 # ------------------------------------------------------------------ helpers
 
@@ -23,30 +71,166 @@ def _eager_options():
     ]
 
 
+async def _apply_similarity_threshold(db: AsyncSession) -> None:
+    """Set the pg_trgm similarity thresholds for the current transaction.
+
+    The ``%`` / ``<%`` operators compare against these GUCs (rather than an
+    explicit ``similarity() >= x``) so Postgres can answer them from the GIN
+    trigram indexes.
+    """
+    threshold = str(settings.SEARCH_SIMILARITY_THRESHOLD)
+    await db.execute(
+        select(
+            func.set_config("pg_trgm.similarity_threshold", threshold, True),
+            func.set_config("pg_trgm.word_similarity_threshold", threshold, True),
+        )
+    )
+
+
+def _tag_names_column():
+    """Correlated subquery returning the entry's sorted tag names (never NULL)."""
+    tag_names = (
+        select(func.array_agg(aggregate_order_by(Tag.name, Tag.name)))
+        .select_from(entry_tags.join(Tag, Tag.id == entry_tags.c.tag_id))
+        .where(entry_tags.c.entry_id == Entry.id)
+        .correlate(Entry)
+        .scalar_subquery()
+    )
+    return func.coalesce(tag_names, cast(array([]), ARRAY(String))).label("tags")
+
+
+def _json_array_column(model, label: str, **fields):
+    """Correlated subquery aggregating *model* rows of the entry into a JSON array."""
+    items = func.json_agg(
+        func.json_build_object(*(part for key, col in fields.items() for part in (key, col)))
+    )
+    return (
+        select(func.coalesce(items, func.json_build_array(), type_=JSON))
+        .where(model.entry_id == Entry.id)
+        .correlate(Entry)
+        .scalar_subquery()
+        .label(label)
+    )
+
+
+def _aggregate_columns():
+    """Entry columns plus tags / links / attachments as JSON arrays.
+
+    Shaped like ``EntryResponse``, so a write can RETURN the whole aggregate
+    instead of reloading it with ``selectinload``.
+    """
+    tags = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("id", Tag.id, "name", Tag.name), Tag.name
+                    )
+                ),
+                func.json_build_array(),
+                type_=JSON,
+            )
+        )
+        .select_from(entry_tags.join(Tag, Tag.id == entry_tags.c.tag_id))
+        .where(entry_tags.c.entry_id == Entry.id)
+        .correlate(Entry)
+        .scalar_subquery()
+    )
+    return [
+        Entry.id,
+        Entry.user_id,
+        Entry.date,
+        Entry.title,
+        Entry.content,
+        Entry.created_at,
+        Entry.updated_at,
+        Entry.version,
+        tags.label("tags"),
+        _json_array_column(Link, "links", id=Link.id, title=Link.title, url=Link.url),
+        _json_array_column(
+            Attachment,
+            "attachments",
+            id=Attachment.id,
+            file_name=Attachment.file_name,
+            file_url=Attachment.file_url,
+            uploaded_at=Attachment.uploaded_at,
+        ),
+    ]
+
+
+def _summary_columns():
+    """Compact projection for ``view="summary"``: no content, no eager loads.
+
+    Tag names and link / attachment counts come from correlated subqueries so
+    the whole page is a single statement.
+    """
+    link_count = (
+        select(func.count()).where(Link.entry_id == Entry.id).correlate(Entry).scalar_subquery()
+    )
+    attachment_count = (
+        select(func.count())
+        .where(Attachment.entry_id == Entry.id)
+        .correlate(Entry)
+        .scalar_subquery()
+    )
+    return [
+        Entry.id,
+        Entry.date,
+        Entry.title,
+        Entry.excerpt,
+        Entry.created_at,
+        _tag_names_column(),
+        link_count.label("link_count"),
+        attachment_count.label("attachment_count"),
+    ]
+
+
+def _excerpt(content: str) -> str:
+    """Collapse whitespace and truncate *content* for list views."""
+    return " ".join(content.split())[:EXCERPT_LENGTH]
+
+
+def _search_vector(title, content):
+    """Build the weighted tsvector for an entry: title ranks above content."""
+    return func.setweight(func.to_tsvector(FTS_CONFIG, func.coalesce(title, "")), "A").op("||")(
+        func.setweight(func.to_tsvector(FTS_CONFIG, content), "B")
+    )
+
+
 # ------------------------------------------------------------------ tags
 
 
 async def resolve_tags(tag_names: list[str], user_id: uuid.UUID, db: AsyncSession) -> list[Tag]:
-    """Get-or-create Tag rows for a list of tag name strings, scoped to user."""
-    if not tag_names:
+    """Get-or-create Tag rows for a list of tag name strings, scoped to user.
+
+    All missing tags are created by one ``INSERT … ON CONFLICT DO NOTHING
+    RETURNING``; names that already existed (or were just created by a
+    concurrent request, which the insert waits for) are read back with a
+    single SELECT. Never raises on the ``uq_tag_name_user`` constraint.
+    Returns the tags sorted by name.
+    """
+    # Sorted so concurrent callers lock the unique index entries in the same order.
+    unique_names = sorted({name.strip().lower() for name in tag_names if name.strip()})
+    if not unique_names:
         return []
 
-    unique_names = list({name.strip().lower() for name in tag_names if name.strip()})
-
-    result = await db.execute(select(Tag).where(Tag.name.in_(unique_names), Tag.user_id == user_id))
-    existing: dict[str, Tag] = {t.name: t for t in result.scalars().all()}
+    stmt = (
+        pg_insert(Tag)
+        .values([{"id": uuid.uuid4(), "name": name, "user_id": user_id} for name in unique_names])
+        .on_conflict_do_nothing(constraint="uq_tag_name_user")
+        .returning(Tag)
+    )
+    created = (await db.scalars(stmt)).all()
+    tags: dict[str, Tag] = {t.name: t for t in created}
 
-    tags: list[Tag] = []
-    for name in unique_names:
-        if name in existing:
-            tags.append(existing[name])
-        else:
-            new_tag = Tag(name=name, user_id=user_id)
-            db.add(new_tag)
-            tags.append(new_tag)
+    remaining = [name for name in unique_names if name not in tags]
+    if remaining:
+        result = await db.scalars(
+            select(Tag).where(Tag.user_id == user_id, Tag.name.in_(remaining))
+        )
+        tags.update({t.name: t for t in result.all()})
 
-    await db.flush()
-    return tags
+    return [tags[name] for name in unique_names]
 
 
 # ------------------------------------------------------------------ CRUD
@@ -61,29 +245,84 @@ async def create_entry(
     links: list[dict],
     db: AsyncSession,
 ) -> Entry:
-    """Insert a new entry with tags and links, return it fully loaded."""
+    """Insert a new entry with tags and links, return it fully loaded.
+
+    Everything goes out in a single flush: the entry INSERT returns its
+    server defaults (``eager_defaults``), and the ``entry_tags`` rows and
+    links are each batched into one statement. The returned aggregate is
+    the object graph just written — no re-SELECT.
+    """
     entry = Entry(
         user_id=user_id,
         date=entry_date,
         title=title,
         content=content,
+        excerpt=_excerpt(content),
+        search_vector=_search_vector(title, content),
         tags=tags,
+        links=[Link(title=link_data["title"], url=link_data["url"]) for link_data in links],
+        attachments=[],
     )
     db.add(entry)
     await db.flush()
+    return entry
 
-    for link_data in links:
-        db.add(
-            Link(
-                entry_id=entry.id,
-                title=link_data["title"],
-                url=link_data["url"],
-            )
+
+async def bulk_insert_entries(
+    user_id: uuid.UUID,
+    items: list[dict],
+    tags_by_name: dict[str, Tag],
+    db: AsyncSession,
+) -> list[uuid.UUID]:
+    """Insert many entries with their tags and links using set-based statements.
+
+    Each item is ``{"date", "title", "content", "tags": [name], "links": [{"title", "url"}]}``
+    with tag names already normalised and present in *tags_by_name*. Entries,
+    ``entry_tags`` rows and links each go out as one executemany (batched into
+    multi-row ``VALUES`` by the driver). Returns the new entry ids in item order.
+    """
+    if not items:
+        return []
+
+    entry_rows: list[dict] = []
+    tag_rows: list[dict] = []
+    link_rows: list[dict] = []
+    for item in items:
+        entry_id = uuid.uuid4()
+        entry_rows.append(
+            {
+                "id": entry_id,
+                "user_id": user_id,
+                "date": item["date"],
+                "title": item["title"],
+                "content": item["content"],
+                "excerpt": _excerpt(item["content"]),
+                "sv_title": item["title"],
+                "sv_content": item["content"],
+            }
+        )
+        tag_rows.extend(
+            {"entry_id": entry_id, "tag_id": tags_by_name[name].id} for name in item["tags"]
+        )
+        link_rows.extend(
+            {"id": uuid.uuid4(), "entry_id": entry_id, "title": lk["title"], "url": lk["url"]}
+            for lk in item["links"]
         )
-    await db.flush()
 
-    result = await db.execute(select(Entry).options(*_eager_options()).where(Entry.id == entry.id))
-    return result.scalar_one()
+    await db.execute(
+        insert(Entry.__table__).values(
+            search_vector=_search_vector(
+                bindparam("sv_title", type_=String), bindparam("sv_content", type_=Text)
+            )
+        ),
+        entry_rows,
+    )
+    if tag_rows:
+        await db.execute(insert(entry_tags), tag_rows)
+    if link_rows:
+        await db.execute(insert(Link.__table__), link_rows)
+
+    return [row["id"] for row in entry_rows]
 
 
 async def find_entry_by_id(
@@ -100,18 +339,52 @@ async def find_entry_by_id(
     return result.scalar_one_or_none()
 
 
+async def find_entry_version(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> int | None:
+    """Return the entry's current version, or None if it does not exist / is not owned."""
+    result = await db.execute(
+        select(Entry.version).where(Entry.id == entry_id, Entry.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
 async def list_entries(
     user_id: uuid.UUID,
     db: AsyncSession,
     date_filter: str | None = None,
     tag_filter: str | None = None,
     search_filter: str | None = None,
+    search_mode: SearchMode = "substring",
     offset: int = 0,
     limit: int = 20,
-) -> tuple[list[Entry], int]:
-    """List entries with optional filters. Returns (entries, total)."""
-    base = select(Entry).where(Entry.user_id == user_id)
+    after: tuple[date_type, datetime, uuid.UUID] | None = None,
+    total_mode: TotalMode = "exact",
+    view: EntryView = "full",
+) -> tuple[list[Row], int | None]:
+    """List entries with optional filters. Returns (rows, total).
+
+    Each row holds the ``Entry`` first (or the :func:`_summary_columns`
+    with *view* ``"summary"``). Full-text searches are ordered by relevance
+    and add a highlighted ``snippet`` column; trigram searches are ordered by word
+    similarity. Every other listing is newest first, i.e. by
+    ``(date, created_at, id)`` descending — when *after* is such a key the
+    page starts right below it (keyset seek) and *offset* is ignored.
+
+    *total_mode* ``"exact"`` returns the total from a ``count(*) OVER ()``
+    column on the page query itself, ``"estimate"`` reads the per-user
+    counter in ``user_stats`` when no filter is applied (exact count
+    otherwise) and ``"none"`` skips counting and returns ``None``.
+
+    """
+    if view == "summary":
+        base = select(*_summary_columns()).where(Entry.user_id == user_id)
+    else:
+        base = select(Entry).where(Entry.user_id == user_id)
     count_q = select(func.count()).select_from(Entry).where(Entry.user_id == user_id)
+    order_by = [Entry.date.desc(), Entry.created_at.desc(), Entry.id.desc()]
 
     if date_filter:
         d = date_type.fromisoformat(date_filter)
@@ -127,23 +400,130 @@ async def list_entries(
             .where(Tag.name == tag_name)
         )
 
-    if search_filter:
+    ts_query = None
+    if search_filter and search_mode == "fulltext":
+        ts_query = func.websearch_to_tsquery(FTS_CONFIG, search_filter)
+        search_cond = Entry.search_vector.bool_op("@@")(ts_query)
+        base = base.add_columns(
+            func.ts_headline(FTS_CONFIG, _escaped_content(), ts_query, _HEADLINE_OPTIONS).label(
+                "snippet"
+            )
+        ).where(search_cond)
+        count_q = count_q.where(search_cond)
+        order_by.insert(0, func.ts_rank_cd(Entry.search_vector, ts_query).desc())
+    elif search_filter and search_mode == "trigram":
+        # Substring matches and typo-tolerant word matches, both served by the
+        # gin_trgm_ops indexes on entries.title / entries.content / tags.name.
+        await _apply_similarity_threshold(db)
+        pattern = f"%{search_filter}%"
+        term = literal(search_filter)
+        # Aliased so the subquery doesn't correlate with the tag_filter join.
+        et, tg = entry_tags.alias(), aliased(Tag)
+        tag_match = exists().where(
+            et.c.entry_id == Entry.id,
+            et.c.tag_id == tg.id,
+            tg.name.ilike(pattern) | term.op("<%")(tg.name),
+        )
+        search_cond = (
+            Entry.title.ilike(pattern)
+            | Entry.content.ilike(pattern)
+            | term.op("<%")(Entry.title)
+            | term.op("<%")(Entry.content)
+            | tag_match
+        )
+        base = base.where(search_cond)
+        count_q = count_q.where(search_cond)
+        similarity = func.greatest(
+            func.word_similarity(term, func.coalesce(Entry.title, "")),
+            func.word_similarity(term, Entry.content),
+        )
+        order_by.insert(0, similarity.desc())
+    elif search_filter:
         pattern = f"%{search_filter}%"
         search_cond = Entry.title.ilike(pattern) | Entry.content.ilike(pattern)
         base = base.where(search_cond)
         count_q = count_q.where(search_cond)
 
-    total_result = await db.execute(count_q)
-    total = total_result.scalar_one()
-
-    result = await db.execute(
-        base.options(*_eager_options())
-        .order_by(Entry.date.desc(), Entry.created_at.desc())
-        .offset(offset)
-        .limit(limit)
+    total_col = None
+    if total_mode == "estimate" and not (date_filter or tag_filter or search_filter):
+        # Unfiltered: read the maintained per-user counter instead of counting rows.
+        count_q = select(
+            func.coalesce(
+                select(UserStats.total_entries)
+                .where(UserStats.user_id == user_id)
+                .scalar_subquery(),
+                0,
+            )
+        )
+        total_col = count_q.scalar_subquery()
+    elif total_mode != "none" and after is None:
+        # Window count over the filtered set: page and total in a single statement.
+        total_col = func.count().over()
+    if total_col is not None:
+        base = base.add_columns(total_col.label("full_count"))
+
+    if after is not None:
+        key = (Entry.date, Entry.created_at, Entry.id)
+        base = base.where(tuple_(*key) < tuple_(*after, types=[c.type for c in key]))
+    else:
+        base = base.offset(offset)
+
+    if view == "summary":
+        result = await db.execute(base.order_by(*order_by).limit(limit))
+        rows = result.all()
+    else:
+        result = await db.execute(base.options(*_eager_options()).order_by(*order_by).limit(limit))
+        rows = result.unique().all()
+
+    total: int | None = None
+    if total_mode == "none":
+        pass
+    elif rows and total_col is not None:
+        total = rows[-1].full_count
+    elif not rows and after is None and offset == 0:
+        total = 0
+    else:
+        # Keyset page (the window only sees rows past the cursor) or a page past the end.
+        total = (await db.execute(count_q)).scalar_one()
+    return list(rows), total
+
+
+async def stream_entries_for_export(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    batch_size: int = 200,
+) -> AsyncIterator[Sequence[Row]]:
+    """Yield batches of a user's entries, oldest first, from a server-side cursor.
+
+    Each row carries the entry fields plus ``tags`` (names), ``links`` and
+    ``attachments`` (JSON arrays), so nothing is loaded as ORM objects and
+    memory stays bounded by *batch_size* however large the journal is.
+    """
+    stmt = (
+        select(
+            Entry.id,
+            Entry.date,
+            Entry.title,
+            Entry.content,
+            Entry.created_at,
+            Entry.updated_at,
+            _tag_names_column(),
+            _json_array_column(Link, "links", title=Link.title, url=Link.url),
+            _json_array_column(
+                Attachment,
+                "attachments",
+                file_name=Attachment.file_name,
+                file_url=Attachment.file_url,
+                uploaded_at=Attachment.uploaded_at,
+            ),
+        )
+        .where(Entry.user_id == user_id)
+        .order_by(Entry.date, Entry.created_at, Entry.id)
+        .execution_options(yield_per=batch_size)
     )
-    entries = list(result.scalars().unique().all())
-    return entries, total
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        yield partition
 
 
 async def update_entry_fields(
@@ -155,52 +535,231 @@ async def update_entry_fields(
     links: list[dict] | None,
     db: AsyncSession,
 ) -> Entry:
-    """Apply field updates to an existing entry, return it reloaded."""
+    """Apply field updates to a fully loaded entry and return the same aggregate.
+
+    Tags and links are diffed against the loaded collections, so only the
+    ``entry_tags`` rows and links that actually changed are deleted or
+    inserted; unchanged links keep their ids. ``updated_at`` comes back via
+    RETURNING (the mapper uses ``eager_defaults``), so no reload is needed.
+    Raises ``StaleDataError`` if the row's version moved since it was loaded.
+    """
     if entry_date is not None:
         entry.date = entry_date
-    if title is not None:
+
+    text_changed = False
+    if title is not None and title != entry.title:
         entry.title = title
-    if content is not None:
+        text_changed = True
+    if content is not None and content != entry.content:
         entry.content = content
+        entry.excerpt = _excerpt(content)
+        text_changed = True
+    if text_changed:
+        entry.search_vector = _search_vector(entry.title, entry.content)
 
-    if tags is not None:
-        entry.tags.clear()
-        entry.tags.extend(tags)
+    # Replacing a collection only emits the members that differ.
+    relations_changed = False
+    if tags is not None and {t.id for t in tags} != {t.id for t in entry.tags}:
+        entry.tags = tags
+        relations_changed = True
 
     if links is not None:
-        await db.execute(delete(Link).where(Link.entry_id == entry.id))
-        await db.flush()
-        for link_data in links:
-            db.add(
-                Link(
-                    entry_id=entry.id,
-                    title=link_data["title"],
-                    url=link_data["url"],
+        existing: dict[tuple[str | None, str], list[Link]] = {}
+        for link in entry.links:
+            existing.setdefault((link.title, link.url), []).append(link)
+        new_links = [
+            existing[key].pop() if existing.get(key) else Link(title=key[0], url=key[1])
+            for key in ((link_data["title"], link_data["url"]) for link_data in links)
+        ]
+        if new_links != entry.links:
+            entry.links = new_links
+            relations_changed = True
+
+    # Tag / link changes alone leave the entries row untouched; touch it so
+    # ``version`` and ``updated_at`` still move.
+    if relations_changed and not db.is_modified(entry, include_collections=False):
+        entry.updated_at = func.now()
+
+    await db.flush()
+    return entry
+
+
+def _data_version_bump(user_id: uuid.UUID, changed):
+    """CTE bumping the user's data version if *changed* returned a row.
+
+    Entry creation always goes through ``stats_repo.record_entry_changes``,
+    so the user_stats row exists whenever there is an entry to change.
+    """
+    return (
+        update(UserStats)
+        .where(UserStats.user_id == user_id, exists(select(changed.c.id)))
+        .values(data_version=UserStats.data_version + 1)
+        .cte("stats")
+    )
+
+
+async def update_entry_scalars(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    entry_date: date_type | None = None,
+    title: str | None = None,
+    content: str | None = None,
+    expected_version: int | None = None,
+) -> Row | None:
+    """Update date / title / content with one ``UPDATE ... RETURNING``.
+
+    The row is only written, and the user's data version only bumped (in the
+    same statement), if some given value differs from the stored one; else
+    the unchanged row is selected instead. The returned row carries the whole
+    aggregate (see :func:`_aggregate_columns`), ``written``, and
+    ``previous_date`` when *entry_date* is given.
+    Returns None if no row matched: the entry does not exist, belongs to
+    another user, or its version differs from *expected_version*.
+    """
+    conditions = [Entry.id == entry_id, Entry.user_id == user_id]
+    if expected_version is not None:
+        conditions.append(Entry.version == expected_version)
+    # Read before the guard is added: these also select the unchanged row.
+    unchanged_conditions = list(conditions)
+    conditions.append(
+        or_(
+            *(
+                column.is_distinct_from(value)
+                for column, value in (
+                    (Entry.date, entry_date),
+                    (Entry.title, title),
+                    (Entry.content, content),
                 )
+                if value is not None
             )
+        )
+    )
 
-    await db.flush()
+    values: dict = {"version": Entry.version + 1, "updated_at": func.now()}
+    if entry_date is not None:
+        values["date"] = entry_date
+    if title is not None:
+        values["title"] = title
+    if content is not None:
+        values["content"] = content
+        values["excerpt"] = _excerpt(content)
+    if title is not None or content is not None:
+        # Unchanged fields are taken from the row being updated.
+        values["search_vector"] = _search_vector(
+            Entry.title if title is None else title,
+            Entry.content if content is None else content,
+        )
 
-    result = await db.execute(select(Entry).options(*_eager_options()).where(Entry.id == entry.id))
-    return result.scalar_one()
+    returning = [*_aggregate_columns(), true().label("written")]
+    unchanged = [*_aggregate_columns(), false().label("written")]
+    if entry_date is not None:
+        # UPDATE ... FROM a locked self-select exposes the pre-update date,
+        # which the caller needs to move the entry between heatmap days.
+        previous = (
+            select(Entry.id, Entry.date)
+            .where(Entry.id == entry_id, Entry.user_id == user_id)
+            .with_for_update()
+            .subquery("previous")
+        )
+        conditions.append(previous.c.id == Entry.id)
+        returning.append(previous.c.date.label("previous_date"))
+        unchanged.append(Entry.date.label("previous_date"))
+
+    updated = (
+        update(Entry.__table__)
+        .where(*conditions)
+        .values(**values)
+        .returning(*returning)
+        .cte("updated")
+    )
+    # Both branches read the pre-statement snapshot; the second only yields
+    # a row when the first did not, i.e. when every value was already stored.
+    query = union_all(
+        select(updated),
+        select(*unchanged).where(*unchanged_conditions, ~exists(select(updated.c.id))),
+    ).add_cte(_data_version_bump(user_id, updated))
+    result = await db.execute(query)
+    return result.one_or_none()
 
 
-async def delete_entry(entry: Entry, db: AsyncSession) -> None:
-    """Delete an entry from the database."""
-    await db.delete(entry)
-    await db.flush()
+async def delete_entry_by_id(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    expected_version: int | None = None,
+) -> Row | None:
+    """Delete an entry with one ``DELETE ... RETURNING``.
+
+    Links, attachments and ``entry_tags`` rows go with it through their
+    ``ON DELETE CASCADE`` foreign keys. Returns ``(id, date, tag_ids)`` for
+    the caller's bookkeeping, or None if no row matched (missing, not owned,
+    or *expected_version* differs).
+    """
+    conditions = [Entry.id == entry_id, Entry.user_id == user_id]
+    if expected_version is not None:
+        conditions.append(Entry.version == expected_version)
+
+    # RETURNING sees entry_tags before the cascade removes them.
+    tag_ids = (
+        select(func.array_agg(entry_tags.c.tag_id))
+        .where(entry_tags.c.entry_id == Entry.id)
+        .correlate(Entry)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        delete(Entry.__table__)
+        .where(*conditions)
+        .returning(Entry.id, Entry.date, tag_ids.label("tag_ids"))
+    )
+    return result.one_or_none()
+
+
+async def touch_entry(entry_id: uuid.UUID, user_id: uuid.UUID, db: AsyncSession) -> None:
+    """Record a change to an entry's child rows (attachments).
+
+    Bumps the entry's version and ``updated_at`` plus the user's data version,
+    so ETags derived from either stop matching.
+    """
+    touched = (
+        update(Entry.__table__)
+        .where(Entry.id == entry_id, Entry.user_id == user_id)
+        .values(version=Entry.version + 1, updated_at=func.now())
+        .returning(Entry.id)
+        .cte("touched")
+    )
+    await db.execute(select(touched.c.id).add_cte(_data_version_bump(user_id, touched)))
 
 
 # ------------------------------------------------------------------ tags (user-scoped)
 
 
-async def list_user_tags(user_id: uuid.UUID, db: AsyncSession) -> list[str]:
-    """Return sorted distinct tag names used by a given user."""
-    result = await db.execute(
-        select(distinct(Tag.name))
+async def list_user_tags(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    query: str | None = None,
+) -> list[str]:
+    """Return sorted distinct tag names used by a given user.
+
+    With *query*, only names containing it or similar to it (pg_trgm) are
+    returned, best matches first.
+    """
+    stmt = (
+        select(Tag.name)
         .join(entry_tags, Tag.id == entry_tags.c.tag_id)
         .join(Entry, Entry.id == entry_tags.c.entry_id)
         .where(Entry.user_id == user_id)
-        .order_by(Tag.name)
+        .group_by(Tag.name)
+    )
+    if not query:
+        result = await db.execute(stmt.order_by(Tag.name))
+        return list(result.scalars().all())
+
+    await _apply_similarity_threshold(db)
+    term = query.strip().lower()
+    result = await db.execute(
+        stmt.where(Tag.name.contains(term, autoescape=True) | Tag.name.op("%")(term)).order_by(
+            func.similarity(Tag.name, term).desc(), Tag.name
+        )
     )
     return list(result.scalars().all())
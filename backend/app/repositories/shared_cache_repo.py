@@ -0,0 +1,73 @@
+"""Shared cache repository — the UNLOGGED shared_cache table behind the analytics cache."""
+
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.shared_cache_entry import SharedCacheEntry
+from app.models.user_stats import UserStats
+
+
+async def lookup(key: str, user_id: uuid.UUID, db: AsyncSession) -> tuple[int | None, bytes | None]:
+    """Return ``(data_version, value)`` for *key* in one primary-key join.
+
+    The value is only returned if it was stored at the user's current data
+    version and has not expired; the version is None for a user who has
+    never written.
+    """
+    result = await db.execute(
+        select(UserStats.data_version, SharedCacheEntry.value)
+        .select_from(UserStats)
+        .outerjoin(
+            SharedCacheEntry,
+            and_(
+                SharedCacheEntry.key == key,
+                SharedCacheEntry.user_id == UserStats.user_id,
+                SharedCacheEntry.data_version == UserStats.data_version,
+                SharedCacheEntry.expires_at > func.now(),
+            ),
+        )
+        .where(UserStats.user_id == user_id)
+    )
+    row = result.one_or_none()
+    return (None, None) if row is None else (row.data_version, row.value)
+
+
+async def store(
+    key: str,
+    user_id: uuid.UUID,
+    data_version: int,
+    value: bytes,
+    ttl: int,
+    db: AsyncSession,
+) -> None:
+    """Upsert *value* for *key*, unless a newer data version is already stored."""
+    stmt = insert(SharedCacheEntry).values(
+        key=key,
+        user_id=user_id,
+        data_version=data_version,
+        value=value,
+        expires_at=func.now() + timedelta(seconds=ttl),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SharedCacheEntry.key],
+            set_={
+                "data_version": stmt.excluded.data_version,
+                "value": stmt.excluded.value,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=SharedCacheEntry.data_version <= stmt.excluded.data_version,
+        )
+    )
+
+
+async def purge_expired(db: AsyncSession) -> int:
+    """Delete expired rows and return how many went."""
+    result = await db.execute(
+        delete(SharedCacheEntry).where(SharedCacheEntry.expires_at <= func.now())
+    )
+    return result.rowcount
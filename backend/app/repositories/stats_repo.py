@@ -0,0 +1,245 @@
+"""Stats repository — maintained per-user counters in user_stats and user_daily_counts."""
+
+import uuid
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, Text, bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entry import Entry
+from app.models.tag import Tag, entry_tags
+from app.models.user_daily_count import UserDailyCount
+from app.models.user_stats import UserStats
+
+# ------------------------------------------------------------------ streak arithmetic
+
+
+def _streak_after_new_day(
+    streak_end: date | None, streak_length: int, longest: int, day: date
+) -> dict | None:
+    """Streak columns after *day* got its first entry, or None if *day* is not
+    after the latest streak (a backdated day may merge runs: recompute)."""
+    if streak_end is not None and day <= streak_end:
+        return None
+    length = streak_length + 1 if streak_end == day - timedelta(days=1) else 1
+    return {"streak_end": day, "streak_length": length, "longest_streak": max(longest, length)}
+
+
+def streaks_from_days(days: Sequence[date]) -> dict:
+    """Streak columns computed from every entry day, in ascending order."""
+    end: date | None = None
+    length = longest = 0
+    for day in days:
+        length = length + 1 if end == day - timedelta(days=1) else 1
+        end = day
+        longest = max(longest, length)
+    return {"streak_end": end, "streak_length": length, "longest_streak": longest}
+
+
+def _top_tag():
+    """Scalar subquery: the user's most used tag (ties broken by name)."""
+    return (
+        select(Tag.name)
+        .where(Tag.user_id == UserStats.user_id, Tag.entry_count > 0)
+        .order_by(Tag.entry_count.desc(), Tag.name)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+# ------------------------------------------------------------------ writes
+
+
+async def _apply_daily_counts(
+    user_id: uuid.UUID, deltas: Mapping[date, int], db: AsyncSession
+) -> tuple[set[date], set[date]]:
+    """Apply signed per-date deltas to the heatmap rollup.
+
+    One multi-row upsert, written in date order so concurrent writers lock
+    rows in the same order. Returns the days that gained their first entry
+    and the days that lost their last one.
+    """
+    stmt = insert(UserDailyCount).values(
+        [{"user_id": user_id, "date": day, "count": delta} for day, delta in sorted(deltas.items())]
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserDailyCount.user_id, UserDailyCount.date],
+            set_={"count": UserDailyCount.count + stmt.excluded.count},
+        ).returning(UserDailyCount.date, UserDailyCount.count)
+    )
+    appeared: set[date] = set()
+    vanished: set[date] = set()
+    for day, count in result.all():
+        if deltas[day] > 0 and count == deltas[day]:
+            appeared.add(day)
+        elif deltas[day] < 0 and count <= 0:
+            vanished.add(day)
+    return appeared, vanished
+
+
+async def _active_days(user_id: uuid.UUID, db: AsyncSession) -> list[date]:
+    """Every date the user has entries on, ascending (a rollup range scan)."""
+    result = await db.execute(
+        select(UserDailyCount.date)
+        .where(UserDailyCount.user_id == user_id, UserDailyCount.count > 0)
+        .order_by(UserDailyCount.date)
+    )
+    return list(result.scalars().all())
+
+
+async def record_entry_changes(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    entries: int = 0,
+    dates: Mapping[date, int] | None = None,
+    tags: Mapping[uuid.UUID, int] | None = None,
+) -> None:
+    """Apply an entry write to every per-user aggregate and bump the data version.
+
+    *entries* is the change in entry count, *dates* maps entry dates and
+    *tags* maps tag ids to signed usage deltas. Totals and month counts are
+    added in place; streaks are extended by date arithmetic when a new latest
+    day appears and recomputed from the daily rollup only when a day is
+    backdated or emptied; the top tag is re-picked only when tag usage moved.
+
+    The ``user_stats`` row is written (and locked) first, then the rollup;
+    every writer and ``analytics_repo.rebuild_daily_counts`` use that order.
+    """
+    dates = {day: delta for day, delta in (dates or {}).items() if delta}
+    tags = {tag_id: delta for tag_id, delta in (tags or {}).items() if delta}
+
+    months: Counter[str] = Counter()
+    for day, delta in dates.items():
+        months[day.strftime("%Y-%m")] += delta
+
+    stmt = insert(UserStats).values(
+        user_id=user_id, total_entries=entries, data_version=1, month_counts=dict(months)
+    )
+    month_counts = UserStats.month_counts
+    if months:
+        month_counts = month_counts.op("||")(
+            func.jsonb_build_object(
+                *(
+                    part
+                    for month, delta in sorted(months.items())
+                    for part in (
+                        # jsonb_build_object takes "any": the key needs an explicit type
+                        cast(literal(month), Text),
+                        func.coalesce(UserStats.month_counts[month].astext.cast(Integer), 0)
+                        + delta,
+                    )
+                )
+            )
+        )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "total_entries": UserStats.total_entries + entries,
+                "data_version": UserStats.data_version + 1,
+                "month_counts": month_counts,
+            },
+        ).returning(UserStats.streak_end, UserStats.streak_length, UserStats.longest_streak)
+    )
+    streak_end, streak_length, longest = result.one()
+
+    values: dict = {}
+    if dates:
+        appeared, vanished = await _apply_daily_counts(user_id, dates, db)
+        if appeared or vanished:
+            streaks = None
+            if len(appeared) == 1 and not vanished:
+                streaks = _streak_after_new_day(
+                    streak_end, streak_length, longest, next(iter(appeared))
+                )
+            values.update(streaks or streaks_from_days(await _active_days(user_id, db)))
+
+    if tags:
+        await db.execute(
+            update(Tag.__table__)
+            .where(Tag.id == bindparam("tag_id"))
+            .values(entry_count=Tag.entry_count + bindparam("delta")),
+            [{"tag_id": tag_id, "delta": delta} for tag_id, delta in sorted(tags.items())],
+        )
+        values["top_tag"] = _top_tag()
+
+    if values:
+        await db.execute(update(UserStats).where(UserStats.user_id == user_id).values(**values))
+
+
+async def bump_data_version(user_id: uuid.UUID, db: AsyncSession) -> None:
+    """Mark the user's data as changed, creating the row on first use."""
+    stmt = insert(UserStats).values(user_id=user_id, data_version=1)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={"data_version": UserStats.data_version + 1},
+        )
+    )
+
+
+async def rebuild_user_stats(user_id: uuid.UUID, db: AsyncSession) -> None:
+    """Recompute the user's tag usage and summary columns from entries and the
+    daily rollup (rebuild that first if it may have drifted)."""
+    tag_usage = (
+        select(func.count())
+        .select_from(entry_tags)
+        .where(entry_tags.c.tag_id == Tag.id)
+        .correlate(Tag)
+        .scalar_subquery()
+    )
+    await db.execute(update(Tag).where(Tag.user_id == user_id).values(entry_count=tag_usage))
+
+    result = await db.execute(
+        select(
+            func.to_char(UserDailyCount.date, "YYYY-MM").label("month"),
+            func.sum(UserDailyCount.count),
+        )
+        .where(UserDailyCount.user_id == user_id, UserDailyCount.count > 0)
+        .group_by("month")
+    )
+    month_counts = {month: int(count) for month, count in result.all()}
+    total = select(func.count()).select_from(Entry).where(Entry.user_id == user_id)
+
+    await bump_data_version(user_id, db)
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            total_entries=total.scalar_subquery(),
+            month_counts=month_counts,
+            top_tag=_top_tag(),
+            **streaks_from_days(await _active_days(user_id, db)),
+        )
+    )
+
+
+# ------------------------------------------------------------------ reads
+
+
+async def get_user_stats(user_id: uuid.UUID, db: AsyncSession) -> UserStats | None:
+    """Return the user's maintained stats row (None before their first write)."""
+    result = await db.execute(
+        select(UserStats)
+        .where(UserStats.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_data_version(user_id: uuid.UUID, db: AsyncSession) -> int:
+    """Return the user's data version (0 before their first write)."""
+    result = await db.execute(select(UserStats.data_version).where(UserStats.user_id == user_id))
+    return result.scalar_one_or_none() or 0
+
+
+async def get_data_version_and_date(user_id: uuid.UUID, db: AsyncSession) -> tuple[int, date]:
+    """Return the user's data version and the database's ``CURRENT_DATE``."""
+    version = select(UserStats.data_version).where(UserStats.user_id == user_id).scalar_subquery()
+    result = await db.execute(select(func.coalesce(version, 0), func.current_date()))
+    version, today = result.one()
+    return version, today
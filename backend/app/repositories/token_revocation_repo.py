@@ -0,0 +1,44 @@
+"""Token revocation repository — users whose older access tokens are rejected."""
+
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import Row, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.token_revocation import TokenRevocation
+
+
+async def revoke(user_id: uuid.UUID, min_version: int, db: AsyncSession) -> None:
+    """Reject the user's tokens below *min_version* (never lowering an existing bar)."""
+    stmt = insert(TokenRevocation).values(user_id=user_id, min_version=min_version)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[TokenRevocation.user_id],
+            set_={
+                "min_version": func.greatest(
+                    TokenRevocation.min_version, stmt.excluded.min_version
+                ),
+                "revoked_at": func.now(),
+            },
+        )
+    )
+
+
+async def list_active(max_age: timedelta, db: AsyncSession) -> list[Row]:
+    """Return ``(user_id, min_version)`` of revocations made within *max_age*."""
+    result = await db.execute(
+        select(TokenRevocation.user_id, TokenRevocation.min_version).where(
+            TokenRevocation.revoked_at > func.now() - max_age
+        )
+    )
+    return list(result.all())
+
+
+async def purge_older_than(max_age: timedelta, db: AsyncSession) -> int:
+    """Delete revocations older than *max_age* and return how many went."""
+    result = await db.execute(
+        delete(TokenRevocation).where(TokenRevocation.revoked_at <= func.now() - max_age)
+    )
+    return result.rowcount
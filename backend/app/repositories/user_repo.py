@@ -2,7 +2,7 @@
 
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import Row, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
@@ -20,6 +20,12 @@ async def find_by_id(user_id: uuid.UUID, db: AsyncSession) -> User | None:
     return result.scalar_one_or_none()
 
 
+async def find_principal(user_id: uuid.UUID, db: AsyncSession) -> Row | None:
+    """Return ``(id, token_version)`` of the user, or None, without the rest of the row."""
+    result = await db.execute(select(User.id, User.token_version).where(User.id == user_id))
+    return result.one_or_none()
+
+
 async def create_user(email: str, hashed_password: str, db: AsyncSession) -> User:
     """Insert a new user and return it."""
     user = User(email=email, hashed_password=hashed_password)
@@ -35,6 +41,25 @@ async def update_password(user: User, hashed_password: str, db: AsyncSession) ->
     await db.flush()
 
 
+async def replace_password_hash(
+    user_id: uuid.UUID, old_hash: str, new_hash: str, db: AsyncSession
+) -> bool:
+    """Swap *old_hash* for *new_hash* unless the password changed meanwhile."""
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+    return result.rowcount == 1
+
+
+async def bump_token_version(user: User, db: AsyncSession) -> int:
+    """Increment the user's token version and return the new value."""
+    user.token_version += 1
+    await db.flush()
+    return user.token_version
+
+
 async def delete_user(user: User, db: AsyncSession) -> None:
     """Delete the user and all associated data (cascade)."""
     await db.delete(user)
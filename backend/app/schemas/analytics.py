@@ -4,6 +4,9 @@ import datetime as _dt
 
 from pydantic import BaseModel
 
+# Defined with the setting that selects it; re-exported for the service and API.
+from app.core.config import SummaryMode as SummaryMode
+
 
 class HeatmapDay(BaseModel):
     date: _dt.date
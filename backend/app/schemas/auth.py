@@ -31,6 +31,18 @@ class UserResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CurrentUser(BaseModel):
+    """The authenticated principal handed to route handlers.
+
+    Built from the token's claims and cached, so it is immutable and holds
+    only the id; load the ``User`` row where more is needed.
+    """
+
+    id: uuid.UUID
+
+    model_config = {"from_attributes": True, "frozen": True}
+
+
 class AuthMessage(BaseModel):
     message: str
 
@@ -2,15 +2,31 @@
 
 import datetime as _dt
 import uuid
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
+# "fulltext" uses the ranked tsvector index, "trigram" the pg_trgm indexes
+# (substring + typo-tolerant matches); "substring" is the legacy ILIKE scan.
+SearchMode = Literal["fulltext", "trigram", "substring"]
+
+# How EntryListResponse.total is produced: counted with the page ("exact"),
+# read from the per-user counter when unfiltered ("estimate") or skipped ("none").
+TotalMode = Literal["none", "exact", "estimate"]
+
+# "summary" returns EntrySummary items (excerpt, tag names, counts) instead of full entries.
+EntryView = Literal["full", "summary"]
+
+# Bounds of the underlying columns, so oversized input is a 422 (or a failed
+# bulk import item) rather than a database error.
+TagName = Annotated[str, Field(max_length=100)]
+
 # ---------- Nested create / response schemas ----------
 
 
 class LinkCreate(BaseModel):
-    title: str | None = None
-    url: str
+    title: str | None = Field(None, max_length=500)
+    url: str = Field(..., max_length=2000)
 
 
 class LinkResponse(BaseModel):
@@ -42,17 +58,17 @@ class TagResponse(BaseModel):
 
 class EntryCreate(BaseModel):
     date: _dt.date
-    title: str | None = None
+    title: str | None = Field(None, max_length=500)
     content: str = Field(..., min_length=1)
-    tags: list[str] = Field(default_factory=list)
+    tags: list[TagName] = Field(default_factory=list)
     links: list[LinkCreate] = Field(default_factory=list)
 
 
 class EntryUpdate(BaseModel):
     date: _dt.date | None = None
-    title: str | None = None
+    title: str | None = Field(None, max_length=500)
     content: str | None = None
-    tags: list[str] | None = None
+    tags: list[TagName] | None = None
     links: list[LinkCreate] | None = None
 
 
@@ -64,13 +80,51 @@ class EntryResponse(BaseModel):
     content: str
     created_at: _dt.datetime
     updated_at: _dt.datetime
+    version: int
     tags: list[TagResponse] = []
     links: list[LinkResponse] = []
     attachments: list[AttachmentResponse] = []
+    snippet: str | None = None
 
     model_config = {"from_attributes": True}
 
 
 class EntryListResponse(BaseModel):
     entries: list[EntryResponse]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
+
+
+class EntrySummary(BaseModel):
+    id: uuid.UUID
+    date: _dt.date
+    title: str | None = None
+    excerpt: str
+    created_at: _dt.datetime
+    tags: list[str] = []
+    link_count: int = 0
+    attachment_count: int = 0
+    snippet: str | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class EntrySummaryListResponse(BaseModel):
+    entries: list[EntrySummary]
+    total: int | None
+    next_cursor: str | None = None
+
+
+# ---------- Bulk import ----------
+
+
+class BulkEntryResult(BaseModel):
+    index: int
+    id: uuid.UUID | None = None
+    error: str | None = None
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkEntryResult]
@@ -1,16 +1,39 @@
-"""Analytics service — business logic for heatmap, summary."""
+"""Analytics service — business logic for heatmap, summary and rollup upkeep."""
 
+import asyncio
 import uuid
-from datetime import date
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import analytics_cache
-from app.repositories import analytics_repo
+from app.core.cache import analytics_cache, cached, user_tag
+from app.core.config import settings
+from app.core.invalidation import invalidate
+from app.core.logging import get_logger
+from app.db.session import async_session
+from app.repositories import analytics_repo, stats_repo
+from app.schemas.analytics import SummaryMode
+
+logger = get_logger("analytics")
+
+
+# Bounds the extra connections the "concurrent" summary mode checks out.
+_summary_connections = asyncio.Semaphore(settings.ANALYTICS_SUMMARY_CONNECTIONS)
+
+
+async def _on_own_session(query: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """Run ``query(*args, db, **kwargs)`` on a session of its own from the pool,
+    within the ``ANALYTICS_SUMMARY_CONNECTIONS`` budget."""
+    async with _summary_connections, async_session() as db:
+        return await query(*args, db, **kwargs)
+
 
 # ------------------------------------------------------------------ heatmap
 
 
+@cached("heatmap", cache=analytics_cache, tags=("user:{user_id}:entries",))
 async def get_heatmap(
     user_id: uuid.UUID,
     db: AsyncSession,
@@ -20,61 +43,162 @@ async def get_heatmap(
     """Return [{date, count}] for every date the user has entries.
 
     Optionally filter to a date range [start_date, end_date] inclusive.
-    Results are cached for 60 s per (user, date-range) combination.
+    Results are cached per (user, date-range) combination until the user's
+    entries change, and concurrent misses share one query.
     """
-    cache_key = ("heatmap", user_id, start_date, end_date)
-    cached = analytics_cache.get(cache_key)
-    if cached is not None:
-        return cached
-
-    result = await analytics_repo.get_heatmap_data(
+    return await analytics_repo.get_heatmap_data(
         user_id, db, start_date=start_date, end_date=end_date
     )
-    analytics_cache.set(cache_key, result)
-    return result
 
 
 # ------------------------------------------------------------------ summary
 
 
-async def get_summary(
-    user_id: uuid.UUID,
-    db: AsyncSession,
-) -> dict:
-    """Return aggregated summary metrics for the user.
+async def _summary_from_stats(user_id: uuid.UUID, today: date, db: AsyncSession) -> dict:
+    """Summary from the maintained ``user_stats`` row: one primary-key read.
 
-    Results are cached for 60 s per user.
+    Only the calendar-dependent parts (the current month, whether the latest
+    streak is still alive) are resolved here against *today*.
     """
-    cache_key = ("summary", user_id)
-    cached = analytics_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    stats = await stats_repo.get_user_stats(user_id, db)
+    if stats is None:
+        return {
+            "total_entries": 0,
+            "current_streak": 0,
+            "longest_streak": 0,
+            "most_used_tag": None,
+            "entries_this_month": 0,
+        }
+    alive = stats.streak_end is not None and stats.streak_end >= today - timedelta(days=1)
+    return {
+        "total_entries": stats.total_entries,
+        "current_streak": stats.streak_length if alive else 0,
+        "longest_streak": stats.longest_streak,
+        "most_used_tag": stats.top_tag,
+        "entries_this_month": stats.month_counts.get(today.strftime("%Y-%m"), 0),
+    }
 
-    today = date.today()
+
+async def _summary_single(user_id: uuid.UUID, today: date, db: AsyncSession) -> dict:
+    """Summary recomputed from entries in one CTE statement."""
+    row = await analytics_repo.get_summary_metrics(user_id, today.replace(day=1), today, db)
+    return {
+        "total_entries": row.total_entries,
+        "current_streak": row.current_streak,
+        "longest_streak": row.longest_streak,
+        "most_used_tag": row.most_used_tag,
+        "entries_this_month": row.entries_since,
+    }
+
+
+async def _summary_concurrent(user_id: uuid.UUID, today: date) -> dict:
+    """Summary from the four metric queries, each on its own pooled connection.
+
+    Latency is the slowest query rather than the sum of four round trips, at
+    the cost of up to four pool checkouts on top of the request's own, shared
+    by all summaries in the worker (``ANALYTICS_SUMMARY_CONNECTIONS``): past
+    that budget queries wait for each other rather than for the pool. They
+    run outside the request's transaction, so they see committed data only.
+    """
+    first_of_month = today.replace(day=1)
+    total_entries, entries_this_month, streaks, most_used_tag = await asyncio.gather(
+        _on_own_session(analytics_repo.get_total_entries, user_id),
+        _on_own_session(analytics_repo.get_entries_since, user_id, first_of_month),
+        _on_own_session(analytics_repo.get_streaks, user_id, today),
+        _on_own_session(analytics_repo.get_most_used_tag, user_id),
+    )
+    current_streak, longest_streak = streaks
+    return {
+        "total_entries": total_entries,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "most_used_tag": most_used_tag,
+        "entries_this_month": entries_this_month,
+    }
+
+
+async def _summary_serial(user_id: uuid.UUID, today: date, db: AsyncSession) -> dict:
+    """Summary from the four metric queries, awaited one after another."""
     first_of_month = today.replace(day=1)
 
     total_entries = await analytics_repo.get_total_entries(user_id, db)
     entries_this_month = await analytics_repo.get_entries_since(user_id, first_of_month, db)
-    current_streak, longest_streak = await analytics_repo.get_streaks(user_id, db)
+    current_streak, longest_streak = await analytics_repo.get_streaks(user_id, today, db)
     most_used_tag = await analytics_repo.get_most_used_tag(user_id, db)
 
-    result = {
+    return {
         "total_entries": total_entries,
         "current_streak": current_streak,
         "longest_streak": longest_streak,
         "most_used_tag": most_used_tag,
         "entries_this_month": entries_this_month,
     }
-    analytics_cache.set(cache_key, result)
-    return result
 
 
-# ------------------------------------------------------------------ cache bust
+@cached(
+    "summary",
+    cache=analytics_cache,
+    tags=("user:{user_id}:entries",),
+    ttl=settings.ANALYTICS_SUMMARY_CACHE_TTL,
+)
+async def get_summary(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    today: date | None = None,
+    mode: SummaryMode | None = None,
+) -> dict:
+    """Return aggregated summary metrics for the user as of *today*.
+
+    *today* (default: the server's local date) should come from the same
+    source as the response's validators, e.g. the database's ``CURRENT_DATE``.
+    *mode* (default ``settings.ANALYTICS_SUMMARY_MODE``) picks the query plan;
+    see ``SummaryMode``. Results are cached per user and day until their
+    entries change or for ``ANALYTICS_SUMMARY_CACHE_TTL`` seconds (a default
+    *today* is part of the key as None), and concurrent misses share one
+    computation.
+    """
+    today = today or date.today()
+    mode = mode or settings.ANALYTICS_SUMMARY_MODE
+    if mode == "stats":
+        return await _summary_from_stats(user_id, today, db)
+    if mode == "single":
+        return await _summary_single(user_id, today, db)
+    if mode == "concurrent":
+        return await _summary_concurrent(user_id, today)
+    return await _summary_serial(user_id, today, db)
+
 
+# ------------------------------------------------------------------ rollup upkeep
 
-def invalidate_user_analytics(user_id: uuid.UUID) -> None:
-    """Clear all cached analytics for a user.
 
-    Call this after creating, updating, or deleting an entry.
+async def verify_daily_counts(
+    db: AsyncSession,
+    user_id: uuid.UUID | None = None,
+    repair: bool = False,
+) -> int:
+    """Check ``user_daily_counts`` against ``entries`` and return the number of
+    drifted (user, date) rows.
+
+    With *repair*, every drifted user's rollup is rebuilt from entries and
+    their ``user_stats`` summary recomputed from it. Meant for periodic jobs
+    and one-off maintenance, not the request path: run it with
+    ``python -m scripts.verify_daily_counts``.
     """
-    analytics_cache.invalidate_for_user(user_id)
+    drift = await analytics_repo.find_daily_count_drift(db, user_id)
+    for row in drift:
+        logger.warning(
+            "Daily count drift: user=%s date=%s expected=%d actual=%d",
+            row.user_id,
+            row.date,
+            row.expected,
+            row.actual,
+        )
+    if repair:
+        for drifted_user in sorted({row.user_id for row in drift}):
+            await analytics_repo.rebuild_daily_counts(drifted_user, db)
+            # Also bumps the data version: cached copies and ETags must not survive.
+            await stats_repo.rebuild_user_stats(drifted_user, db)
+            await invalidate(db, user_tag(drifted_user, "entries"))
+        if drift:
+            logger.info("Rebuilt daily counts for %d user(s)", len({r.user_id for r in drift}))
+    return len(drift)
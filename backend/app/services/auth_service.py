@@ -1,16 +1,28 @@
 """Auth service — registration, authentication, current-user resolution."""
 
+import asyncio
+import time
 import uuid
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import principal_cache, user_tag
+from app.core.invalidation import invalidate
 from app.core.logging import get_logger
-from app.core.security import decode_token, hash_password, verify_password
-from app.db.session import get_db
+from app.core.security import (
+    HashingPoolFullError,
+    decode_token,
+    hash_password,
+    hashing_pool,
+    needs_rehash,
+    verify_password,
+)
+from app.db.session import async_session
 from app.models.user import User
 from app.repositories import user_repo
-from app.schemas.auth import ChangePassword, UserRegister
+from app.schemas.auth import ChangePassword, CurrentUser, UserRegister
+from app.services.token_revocation_service import DELETED, revocations, revoke_tokens
 
 logger = get_logger("auth")
 
@@ -46,23 +58,42 @@ async def authenticate_user(email: str, password: str, db: AsyncSession) -> User
             detail="Invalid email or password",
         )
 
+    # Opportunistic: a rehash is a second bcrypt run, so it only takes an
+    # idle worker and never a queue slot an interactive login could need.
+    if needs_rehash(user.hashed_password) and hashing_pool.has_idle_worker():
+        task = asyncio.create_task(_rehash_password(user.id, user.hashed_password, password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
     logger.info("User logged in: %s", user.id)
     return user
 
 
-async def get_current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Extract and validate JWT from cookie, return current user."""
-    token = request.cookies.get("access_token")
+# Rehashes in flight; holding them keeps them from being garbage collected.
+_rehash_tasks: set[asyncio.Task] = set()
 
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-        )
 
+async def _rehash_password(user_id: uuid.UUID, old_hash: str, password: str) -> None:
+    """Re-hash a just-verified password at the current cost, after the login
+    response, on a session of its own. Skipped if the pool is busy (by then):
+    the next login tries again."""
+    if not hashing_pool.has_idle_worker():
+        logger.debug("Hashing pool busy; rehash for user %s deferred", user_id)
+        return
+    try:
+        new_hash = await hash_password(password)
+        async with async_session() as db:
+            if await user_repo.replace_password_hash(user_id, old_hash, new_hash, db):
+                await db.commit()
+                logger.info("Password rehashed for user %s", user_id)
+    except HashingPoolFullError:
+        logger.debug("Hashing pool busy; rehash for user %s deferred", user_id)
+    except Exception:
+        logger.exception("Password rehash failed for user %s", user_id)
+
+
+def _decode_claims(token: str) -> tuple[uuid.UUID, int, float]:
+    """Verify *token*; return its user id, token version and expiry. Raises 401."""
     payload = decode_token(token)
     if not payload:
         logger.warning("Invalid or expired token presented")
@@ -78,24 +109,107 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    user = await user_repo.find_by_id(uuid.UUID(user_id), db)
+    # Tokens minted before versioning carry no claim: they are version 0.
+    return uuid.UUID(user_id), payload.get("ver", 0), payload["exp"]
 
-    if not user:
+
+async def _load_principal(
+    user_id: uuid.UUID, version: int, expires_at: float
+) -> tuple[CurrentUser, int, float]:
+    """Check the token against the ``users`` row, for when the revocation set
+    has not loaded yet. Concurrent requests with the same token share this
+    lookup, so it runs on a session of its own."""
+    async with async_session() as db:
+        row = await user_repo.find_principal(user_id, db)
+
+    if row is None:
         logger.warning("Token references non-existent user: %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    if version < row.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+    return CurrentUser(id=user_id), version, expires_at
+
+
+async def get_current_user(request: Request) -> CurrentUser:
+    """Extract and validate JWT from cookie, return current user.
+
+    Tokens carry the user's ``token_version``, which password changes and
+    account deletion bump, so validity is a check against the in-memory
+    ``revocations`` set and needs no database round trip. A token resolved
+    in the last ``AUTH_CACHE_TTL`` seconds is taken from ``principal_cache``
+    (keyed by its signature, which authenticates its claims) without even
+    decoding it. Until the set first loads, the ``users`` row is checked.
+    """
+    token = request.cookies.get("access_token")
+
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+
+    key = ("principal", token.rpartition(".")[2])
+    resolved = principal_cache.get(key)
+    if resolved is None:
+        user_id, version, expires_at = _decode_claims(token)
+        tags = (user_tag(user_id, "auth"),)
+        if revocations.ready:
+            resolved = (CurrentUser(id=user_id), version, expires_at)
+            principal_cache.set(key, resolved, tags=tags)
+        else:
+            resolved = await principal_cache.get_or_compute(
+                key, lambda: _load_principal(user_id, version, expires_at), tags=tags
+            )
+
+    principal, version, expires_at = resolved
+    if expires_at <= time.time():
+        principal_cache.invalidate(key)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    if not revocations.accepts(principal.id, version):
+        principal_cache.invalidate(key)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+    return principal
+
+
+async def get_profile(principal: CurrentUser, db: AsyncSession) -> User:
+    """Load the full ``User`` row behind *principal*. Raises 401 if it is gone."""
+    user = await user_repo.find_by_id(principal.id, db)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
 
     return user
 
 
 async def change_password(
-    user: User,
+    principal: CurrentUser,
     data: ChangePassword,
     db: AsyncSession,
-) -> None:
-    """Change the current user's password. Raises 400 if current password is wrong."""
+) -> User:
+    """Change the current user's password, revoking every token issued before.
+
+    Returns the user with its new ``token_version`` to issue a fresh token
+    from. Raises 400 if current password is wrong.
+    """
+    user = await get_profile(principal, db)
+
     if not await verify_password(data.current_password, user.hashed_password):
         logger.warning("Failed password change attempt for user %s", user.id)
         raise HTTPException(
@@ -105,11 +219,17 @@ async def change_password(
 
     new_hash = await hash_password(data.new_password)
     await user_repo.update_password(user, new_hash, db)
+    await revoke_tokens(user.id, await user_repo.bump_token_version(user, db), db)
+    await invalidate(db, user_tag(user.id, "auth"))
     logger.info("Password changed for user %s", user.id)
+    return user
 
 
-async def delete_account(user: User, db: AsyncSession) -> None:
+async def delete_account(principal: CurrentUser, db: AsyncSession) -> None:
     """Permanently delete the user and all associated data."""
+    user = await get_profile(principal, db)
     user_id = user.id
+    await revoke_tokens(user_id, DELETED, db)
     await user_repo.delete_user(user, db)
+    await invalidate(db, user_tag(user_id, "auth"))
     logger.info("Account deleted: %s", user_id)
@@ -1,18 +1,46 @@
 """Entry CRUD service — business logic for entries, tags, and links."""
 
 import uuid
+from collections import Counter
+from collections.abc import AsyncIterable
+from datetime import date
 
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.core.cache import cached, lookup_cache, user_tag
+from app.core.config import settings
+from app.core.invalidation import invalidate
 from app.core.logging import get_logger
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.entry import Entry
-from app.repositories import entry_repo
-from app.schemas.entry import EntryCreate, EntryUpdate
-from app.services.analytics_service import invalidate_user_analytics
+from app.repositories import entry_repo, stats_repo
+from app.schemas.entry import (
+    BulkEntryResult,
+    BulkImportResponse,
+    EntryCreate,
+    EntryResponse,
+    EntryUpdate,
+    EntryView,
+    SearchMode,
+    TotalMode,
+)
 
 logger = get_logger("entries")
 
+
+async def _invalidate_user_caches(
+    user_id: uuid.UUID, db: AsyncSession, tags_changed: bool = True
+) -> None:
+    """Evict the user's cached entries and analytics, and their tag list if
+    *tags_changed*, in every worker (see ``app.core.invalidation``)."""
+    kinds = ("entries", "tags") if tags_changed else ("entries",)
+    await invalidate(db, *(user_tag(user_id, kind) for kind in kinds))
+
+
 # ------------------------------------------------------------------ CRUD
 
 
@@ -34,11 +62,95 @@ async def create_entry(
         links=links,
         db=db,
     )
-    invalidate_user_analytics(user_id)
+    await stats_repo.record_entry_changes(
+        user_id, db, entries=1, dates={data.date: 1}, tags={t.id: 1 for t in tags}
+    )
+    await _invalidate_user_caches(user_id, db)
     logger.info("Entry created: %s by user %s", entry.id, user_id)
     return entry
 
 
+def _validation_message(exc: ValidationError) -> str:
+    """Flatten a pydantic error into one ``loc: msg`` line per problem."""
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'entry'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+async def _insert_batch(
+    batch: list[tuple[int, EntryCreate]],
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> list[BulkEntryResult]:
+    """Resolve every tag of the batch at once, then insert it set-based."""
+    items = [
+        {
+            "date": data.date,
+            "title": data.title,
+            "content": data.content,
+            "tags": list({name.strip().lower() for name in data.tags if name.strip()}),
+            "links": [{"title": lk.title, "url": lk.url} for lk in data.links],
+        }
+        for _, data in batch
+    ]
+    all_names = list({name for item in items for name in item["tags"]})
+    tags = await entry_repo.resolve_tags(all_names, user_id, db)
+    tags_by_name = {t.name: t for t in tags}
+
+    ids = await entry_repo.bulk_insert_entries(
+        user_id=user_id,
+        items=items,
+        tags_by_name=tags_by_name,
+        db=db,
+    )
+    await stats_repo.record_entry_changes(
+        user_id,
+        db,
+        entries=len(ids),
+        dates=Counter(item["date"] for item in items),
+        tags=Counter(tags_by_name[name].id for item in items for name in item["tags"]),
+    )
+    return [
+        BulkEntryResult(index=index, id=entry_id)
+        for (index, _), entry_id in zip(batch, ids, strict=True)
+    ]
+
+
+async def bulk_create_entries(
+    raw_items: AsyncIterable[object],
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> BulkImportResponse:
+    """Import many entries in one transaction.
+
+    Items are validated individually — invalid ones are reported in the
+    per-item results and skipped — and valid ones are inserted in batches of
+    ``BULK_IMPORT_BATCH_SIZE``. Analytics are invalidated once at the end.
+    """
+    results: list[BulkEntryResult] = []
+    batch: list[tuple[int, EntryCreate]] = []
+    index = 0
+
+    async for raw in raw_items:
+        try:
+            batch.append((index, EntryCreate.model_validate(raw)))
+        except ValidationError as exc:
+            results.append(BulkEntryResult(index=index, error=_validation_message(exc)))
+        index += 1
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            results.extend(await _insert_batch(batch, user_id, db))
+            batch = []
+    if batch:
+        results.extend(await _insert_batch(batch, user_id, db))
+
+    results.sort(key=lambda r: r.index)
+    created = sum(1 for r in results if r.id is not None)
+    if created:
+        await _invalidate_user_caches(user_id, db)
+    logger.info("Bulk import: %d created, %d failed for user %s", created, index - created, user_id)
+    return BulkImportResponse(created=created, failed=index - created, results=results)
+
+
 async def get_entry_by_id(
     entry_id: uuid.UUID,
     user_id: uuid.UUID,
@@ -56,24 +168,106 @@ async def get_entry_by_id(
     return entry
 
 
+@cached("entry", cache=lookup_cache, key=("user_id", "entry_id"), tags=("user:{user_id}:entries",))
+async def read_entry(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> dict:
+    """Return a single entry (must belong to user) as response data. Raises 404.
+
+    Cached until the user's entries change, unlike ``get_entry_by_id``,
+    whose ORM object callers may modify.
+    """
+    entry = await get_entry_by_id(entry_id, user_id, db)
+    return EntryResponse.model_validate(entry).model_dump()
+
+
 async def list_entries(
     user_id: uuid.UUID,
     db: AsyncSession,
     date_filter: str | None = None,
     tag_filter: str | None = None,
     search_filter: str | None = None,
+    search_mode: SearchMode = "substring",
     offset: int = 0,
     limit: int = 20,
-) -> tuple[list[Entry], int]:
-    """List entries with optional date / tag / search filter."""
-    return await entry_repo.list_entries(
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
+    view: EntryView = "full",
+) -> tuple[list, int | None, str | None]:
+    """List entries with optional date / tag / search filter.
+
+    Returns ``(entries, total, next_cursor)``: ``EntryResponse`` objects, or
+    with ``view="summary"`` lightweight rows matching ``EntrySummary``. ``next_cursor`` is only issued
+    for chronological listings; ranked searches page with ``offset``.
+    Raises 400 for a malformed cursor or a cursor combined with a ranked search.
+    """
+    ranked = bool(search_filter) and search_mode != "substring"
+
+    after = None
+    if cursor:
+        if ranked:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not available for ranked search",
+            )
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            ) from exc
+
+    # Fetch one extra row to learn whether another page exists.
+    entries, total = await entry_repo.list_entries(
         user_id=user_id,
         db=db,
         date_filter=date_filter,
         tag_filter=tag_filter,
         search_filter=search_filter,
+        search_mode=search_mode,
         offset=offset,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
+        total_mode=total_mode,
+        view=view,
+    )
+
+    if view == "full":
+        entries = [
+            EntryResponse.model_validate(row[0]).model_copy(
+                update={"snippet": row._mapping.get("snippet")}
+            )
+            for row in entries
+        ]
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        if not ranked:
+            last = entries[-1]
+            next_cursor = encode_cursor(last.date, last.created_at, last.id)
+    return entries, total, next_cursor
+
+
+async def _unmatched_write_error(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    expected_version: int | None,
+    db: AsyncSession,
+) -> HTTPException:
+    """Explain why a keyed write matched no row: 404 if the entry is gone, else 412."""
+    if (
+        expected_version is None
+        or await entry_repo.find_entry_version(entry_id, user_id, db) is None
+    ):
+        logger.warning("Entry %s not found for user %s", entry_id, user_id)
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entry not found")
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Entry was modified since it was read",
     )
 
 
@@ -82,28 +276,86 @@ async def update_entry(
     data: EntryUpdate,
     user_id: uuid.UUID,
     db: AsyncSession,
-) -> Entry:
-    """Update an existing entry. Raises 404 if not found / not owned."""
+    expected_version: int | None = None,
+) -> Entry | Row:
+    """Update an existing entry.
+
+    Raises 404 if not found / not owned, 412 if *expected_version* is given
+    and no longer matches the stored version.
+    """
+    if (
+        data.tags is None
+        and data.links is None
+        and any(v is not None for v in (data.date, data.title, data.content))
+    ):
+        # Scalar-only edit (the autosave case): one UPDATE ... RETURNING, no load.
+        row = await entry_repo.update_entry_scalars(
+            entry_id,
+            user_id,
+            db,
+            entry_date=data.date,
+            title=data.title,
+            content=data.content,
+            expected_version=expected_version,
+        )
+        if row is None:
+            raise await _unmatched_write_error(entry_id, user_id, expected_version, db)
+        if not row.written:
+            # Every value was already stored: nothing was written or bumped.
+            return row
+        if data.date is not None and row.previous_date != row.date:
+            await stats_repo.record_entry_changes(
+                user_id, db, dates={row.previous_date: -1, row.date: 1}
+            )
+        await _invalidate_user_caches(user_id, db, tags_changed=False)
+        return row
+
     entry = await get_entry_by_id(entry_id, user_id, db)
+    if expected_version is not None and entry.version != expected_version:
+        raise await _unmatched_write_error(entry_id, user_id, expected_version, db)
 
+    # Autosaving editors resend the full tag list; only resolve it when it changed.
     tags = None
     if data.tags is not None:
-        tags = await entry_repo.resolve_tags(data.tags, user_id, db)
+        names = {name.strip().lower() for name in data.tags if name.strip()}
+        if names != {t.name for t in entry.tags}:
+            tags = await entry_repo.resolve_tags(data.tags, user_id, db)
 
     links = None
     if data.links is not None:
         links = [{"title": lk.title, "url": lk.url} for lk in data.links]
 
-    updated = await entry_repo.update_entry_fields(
-        entry=entry,
-        entry_date=data.date,
-        title=data.title,
-        content=data.content,
-        tags=tags,
-        links=links,
-        db=db,
+    version_before, date_before = entry.version, entry.date
+    tag_ids_before = {t.id for t in entry.tags}
+    try:
+        updated = await entry_repo.update_entry_fields(
+            entry=entry,
+            entry_date=data.date,
+            title=data.title,
+            content=data.content,
+            tags=tags,
+            links=links,
+            db=db,
+        )
+    except StaleDataError:
+        # Another request bumped the version between our load and flush.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Entry was modified concurrently, please retry",
+        ) from None
+    if updated.version == version_before:
+        # Nothing was written, so there is nothing to evict.
+        return updated
+
+    tag_ids_after = {t.id for t in updated.tags}
+    await stats_repo.record_entry_changes(
+        user_id,
+        db,
+        dates={date_before: -1, updated.date: 1} if updated.date != date_before else None,
+        tags=dict.fromkeys(tag_ids_after - tag_ids_before, 1)
+        | dict.fromkeys(tag_ids_before - tag_ids_after, -1),
     )
-    invalidate_user_analytics(user_id)
+    await _invalidate_user_caches(user_id, db, tags_changed=tag_ids_after != tag_ids_before)
     return updated
 
 
@@ -111,20 +363,54 @@ async def delete_entry(
     entry_id: uuid.UUID,
     user_id: uuid.UUID,
     db: AsyncSession,
+    expected_version: int | None = None,
 ) -> None:
-    """Delete an entry. Raises 404 if not found / not owned."""
-    entry = await get_entry_by_id(entry_id, user_id, db)
-    await entry_repo.delete_entry(entry, db)
-    invalidate_user_analytics(user_id)
+    """Delete an entry. Raises 404 if not found / not owned, 412 on a stale *expected_version*."""
+    deleted = await entry_repo.delete_entry_by_id(entry_id, user_id, db, expected_version)
+    if deleted is None:
+        raise await _unmatched_write_error(entry_id, user_id, expected_version, db)
+    await stats_repo.record_entry_changes(
+        user_id,
+        db,
+        entries=-1,
+        dates={deleted.date: -1},
+        tags=dict.fromkeys(deleted.tag_ids or (), -1),
+    )
+    await _invalidate_user_caches(user_id, db)
     logger.info("Entry deleted: %s by user %s", entry_id, user_id)
 
 
+# ------------------------------------------------------------------ versions
+
+
+async def get_data_version(user_id: uuid.UUID, db: AsyncSession) -> int:
+    """Return the user's data version, bumped by every entry / tag / attachment write."""
+    return await stats_repo.get_data_version(user_id, db)
+
+
+async def get_data_version_and_date(user_id: uuid.UUID, db: AsyncSession) -> tuple[int, date]:
+    """Return the user's data version and today's date, both from the database,
+    for validators of responses that also move with the calendar."""
+    return await stats_repo.get_data_version_and_date(user_id, db)
+
+
+async def get_entry_version(
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> int | None:
+    """Return the entry's version, or None if it does not exist / is not owned."""
+    return await entry_repo.find_entry_version(entry_id, user_id, db)
+
+
 # ------------------------------------------------------------------ tags
 
 
+@cached("tags", cache=lookup_cache, tags=("user:{user_id}:tags",))
 async def list_user_tags(
     user_id: uuid.UUID,
     db: AsyncSession,
+    query: str | None = None,
 ) -> list[str]:
-    """Return all distinct tag names the user has ever used."""
-    return await entry_repo.list_user_tags(user_id, db)
+    """Return all distinct tag names the user has ever used, optionally fuzzy-matched."""
+    return await entry_repo.list_user_tags(user_id, db, query=query)
@@ -0,0 +1,140 @@
+"""Export service — streams a user's whole journal as NDJSON or a Markdown archive."""
+
+import json
+import uuid
+import zipfile
+import zlib
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.repositories import entry_repo
+
+logger = get_logger("export")
+
+ExportFormat = Literal["ndjson", "markdown-zip"]
+
+# (media type, download file name) per format
+EXPORT_FILES: dict[str, tuple[str, str]] = {
+    "ndjson": ("application/gzip", "growthgrid-export.ndjson.gz"),
+    "markdown-zip": ("application/zip", "growthgrid-export.zip"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+def _entry_dict(row: Any) -> dict[str, Any]:
+    """Convert an export row into a JSON-serialisable dict."""
+    return {
+        "id": str(row.id),
+        "date": row.date.isoformat(),
+        "title": row.title,
+        "content": row.content,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+        "tags": list(row.tags),
+        "links": row.links,
+        "attachments": row.attachments,
+    }
+
+
+def _entry_markdown(row: Any) -> str:
+    """Render an entry as Markdown with YAML front matter.
+
+    String values are JSON-quoted, which is valid YAML and needs no escaping rules.
+    """
+    lines = [
+        "---",
+        f"id: {row.id}",
+        f"date: {row.date.isoformat()}",
+        f"title: {json.dumps(row.title or '')}",
+        f"tags: {json.dumps(list(row.tags))}",
+    ]
+    if row.links:
+        lines.append("links:")
+        for link in row.links:
+            lines.append(f"  - title: {json.dumps(link['title'] or '')}")
+            lines.append(f"    url: {json.dumps(link['url'])}")
+    if row.attachments:
+        lines.append("attachments:")
+        for att in row.attachments:
+            lines.append(f"  - file_name: {json.dumps(att['file_name'])}")
+            lines.append(f"    file_url: {json.dumps(att['file_url'])}")
+    lines += ["---", "", row.content, ""]
+    return "\n".join(lines)
+
+
+class _ChunkSink:
+    """Write-only file object that buffers bytes until drained.
+
+    Having no ``tell``/``seek`` makes :class:`zipfile.ZipFile` write in
+    streaming mode (data descriptors after each member).
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Streams
+# ---------------------------------------------------------------------------
+
+
+async def _ndjson_gzip(batches: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """One JSON object per line, gzip-compressed on the fly."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    async for batch in batches:
+        payload = "".join(json.dumps(_entry_dict(row)) + "\n" for row in batch)
+        # Sync-flush per batch so the client receives data as soon as it is read.
+        yield compressor.compress(payload.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+async def _markdown_zip(batches: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """One Markdown file per entry inside a streamed, deflated ZIP archive."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for batch in batches:
+            for row in batch:
+                info = zipfile.ZipInfo(
+                    f"entries/{row.date.isoformat()}_{row.id.hex[:8]}.md",
+                    date_time=row.created_at.timetuple()[:6],
+                )
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, _entry_markdown(row))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def export_entries(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    export_format: ExportFormat = "ndjson",
+) -> AsyncIterator[bytes]:
+    """Stream every entry of the user in *export_format*, in constant memory."""
+    logger.info("Export started: format=%s user=%s", export_format, user_id)
+    batches = entry_repo.stream_entries_for_export(
+        user_id, db, batch_size=settings.EXPORT_BATCH_SIZE
+    )
+    stream = _markdown_zip(batches) if export_format == "markdown-zip" else _ndjson_gzip(batches)
+    async for chunk in stream:
+        if chunk:
+            yield chunk
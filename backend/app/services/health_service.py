@@ -13,6 +13,7 @@ from sqlalchemy import text
 from app.core.b2_client import get_s3_client
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.security import hashing_pool
 from app.db.session import engine
 
 logger = get_logger("health")
@@ -82,6 +83,14 @@ def _check_storage() -> dict[str, Any]:
         }
 
 
+def _check_password_hashing() -> dict[str, Any]:
+    """Report the bcrypt pool's queue depth and latency."""
+    stats = hashing_pool.stats()
+    # "saturated": new logins are already being turned away with 503s.
+    full = stats["in_flight"] >= stats["workers"] + stats["max_queue"]
+    return {"status": "saturated" if full else "ok", **stats}
+
+
 def _check_system() -> dict[str, Any]:
     """Collect static runtime / OS information."""
     import os
@@ -129,6 +138,7 @@ async def build_health_report(app_version: str) -> dict[str, Any]:
         "checks": {
             "database": db_result,
             "storage": storage_result,
+            "password_hashing": _check_password_hashing(),
             "system": system_result,
         },
     }
@@ -0,0 +1,44 @@
+"""Shared cache service — the Postgres second tier of the analytics cache."""
+
+import time
+from typing import Any
+
+from app.core.logging import get_logger
+from app.db.session import async_session
+from app.repositories import shared_cache_repo
+
+logger = get_logger("shared_cache")
+
+
+def _key_text(key: tuple) -> str:
+    return "|".join(map(str, key))
+
+
+class PostgresBackend:
+    """``SharedBackend`` on the UNLOGGED ``shared_cache`` table.
+
+    The token is the user's data version, which every entry / tag /
+    attachment write bumps in its own transaction: a row stored at an older
+    version is never served, so writes need no explicit delete here and a
+    value computed while a write committed cannot outlive it. Each call uses
+    its own pooled session, so it is safe from background refreshes.
+    """
+
+    def __init__(self, purge_interval: float = 300.0) -> None:
+        self._purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+
+    async def get(self, key: tuple) -> tuple[Any, bytes | None]:
+        async with async_session() as db:
+            return await shared_cache_repo.lookup(_key_text(key), key[1], db)
+
+    async def set(self, key: tuple, token: Any, payload: bytes, ttl: int) -> None:
+        if token is None:
+            return  # the user has never written: nothing worth sharing
+        async with async_session() as db:
+            await shared_cache_repo.store(_key_text(key), key[1], token, payload, ttl, db)
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self._purge_interval
+                purged = await shared_cache_repo.purge_expired(db)
+                logger.debug("Purged %d expired shared cache rows", purged)
+            await db.commit()
@@ -0,0 +1,117 @@
+"""Token revocation service — reject revoked access tokens without a DB round trip."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import async_session, on_commit
+from app.repositories import token_revocation_repo
+
+if TYPE_CHECKING:
+    import uuid
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = get_logger("revocation")
+
+# min_version recorded for a deleted account: no token carries it.
+DELETED = 2**31 - 1
+
+
+class RevocationSet:
+    """In-memory copy of ``token_revocations``, consulted on every request.
+
+    It only holds users who revoked tokens within the token lifetime, so it
+    stays small. It is reloaded every ``refresh_interval`` seconds:
+    revocations made by this worker apply as they commit, those made by other
+    workers within one interval. Until the first load succeeds ``ready`` is
+    False and callers must check the database instead.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 30.0,
+        lifetime: timedelta = timedelta(days=7),
+        purge_interval: float = 3600.0,
+    ) -> None:
+        self._refresh_interval = refresh_interval
+        self._lifetime = lifetime
+        self._purge_interval = purge_interval
+        self._next_purge = time.monotonic()
+        self._min_version: dict[uuid.UUID, int] = {}
+        # Revoked here since the last snapshot was swapped in; merged into the
+        # next one, whose query may have run before their transactions committed.
+        self._recent: dict[uuid.UUID, int] = {}
+        self._task: asyncio.Task | None = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._min_version)
+
+    def accepts(self, user_id: uuid.UUID, version: int) -> bool:
+        """Whether a token of *user_id* carrying *version* is still valid."""
+        return version >= self._min_version.get(user_id, 0)
+
+    def revoke(self, user_id: uuid.UUID, min_version: int) -> None:
+        """Reject this user's tokens below *min_version* in this worker now."""
+        for index in (self._min_version, self._recent):
+            index[user_id] = max(index.get(user_id, 0), min_version)
+
+    def replace(self, rows: list[tuple[uuid.UUID, int]]) -> None:
+        """Swap in a loaded snapshot, keeping revocations made here meanwhile."""
+        fresh = dict(rows)
+        for user_id, min_version in self._recent.items():
+            fresh[user_id] = max(fresh.get(user_id, 0), min_version)
+        self._min_version, self._recent = fresh, {}
+        self.ready = True
+
+    async def refresh(self) -> None:
+        """Reload the set from the database (and purge rows past the lifetime)."""
+        async with async_session() as db:
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self._purge_interval
+                purged = await token_revocation_repo.purge_older_than(self._lifetime, db)
+                logger.debug("Purged %d expired token revocations", purged)
+            rows = await token_revocation_repo.list_active(self._lifetime, db)
+            await db.commit()
+        self.replace([(row.user_id, row.min_version) for row in rows])
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning("Token revocation refresh failed: %r", exc)
+            await asyncio.sleep(self._refresh_interval)
+
+
+revocations = RevocationSet(
+    refresh_interval=settings.AUTH_REVOCATION_REFRESH,
+    lifetime=timedelta(days=settings.JWT_EXPIRY_DAYS),
+)
+
+
+async def revoke_tokens(user_id: uuid.UUID, min_version: int, db: AsyncSession) -> None:
+    """Reject *user_id*'s tokens below *min_version* once *db* commits: in this
+    worker at once, in the others when their next refresh runs. Nothing
+    changes if the transaction rolls back."""
+    await token_revocation_repo.revoke(user_id, min_version, db)
+    on_commit(db, functools.partial(revocations.revoke, user_id, min_version))
@@ -5,10 +5,12 @@ import uuid
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import user_tag
 from app.core.config import settings
+from app.core.invalidation import invalidate
 from app.core.logging import get_logger
 from app.models.attachment import Attachment
-from app.repositories import attachment_repo
+from app.repositories import attachment_repo, entry_repo
 from app.services.entry_service import get_entry_by_id
 from app.services.storage_service import delete_file, generate_presigned_url, upload_file
 
@@ -42,6 +44,8 @@ async def create_attachment(
         file_url=file_url,
         db=db,
     )
+    await entry_repo.touch_entry(entry_id, user_id, db)
+    await invalidate(db, user_tag(user_id, "entries"))
     logger.info("Attachment uploaded: %s for entry %s", attachment.id, entry_id)
     return attachment
 
@@ -66,9 +70,12 @@ async def remove_attachment(
             detail="Attachment not found",
         )
 
+    entry_id = attachment.entry_id
     object_key = _extract_object_key(attachment.file_url)
     await delete_file(object_key)
     await attachment_repo.delete_attachment(attachment, db)
+    await entry_repo.touch_entry(entry_id, user_id, db)
+    await invalidate(db, user_tag(user_id, "entries"))
     logger.info("Attachment deleted: %s", attachment_id)
 
 
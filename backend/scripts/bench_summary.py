@@ -0,0 +1,67 @@
+"""Benchmark the /analytics/summary query plans against the configured database.
+
+Times every ``SummaryMode``'s query plan for one existing user, calling it
+directly (no cache lookup, single-flight or extra session), each run on a
+fresh session, and prints per-mode latency percentiles::
+
+    uv run python -m scripts.bench_summary user@example.com --runs 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date
+
+from app.db.session import async_session, engine
+from app.repositories import user_repo
+from app.services.analytics_service import (
+    _summary_concurrent,
+    _summary_from_stats,
+    _summary_serial,
+    _summary_single,
+)
+
+# One entry per SummaryMode, as get_summary dispatches them.
+_PLANS = {
+    "stats": _summary_from_stats,
+    "single": _summary_single,
+    "concurrent": lambda user_id, today, _db: _summary_concurrent(user_id, today),
+    "serial": _summary_serial,
+}
+
+
+async def _bench(email: str, runs: int, warmup: int) -> None:
+    async with async_session() as db:
+        user = await user_repo.find_by_email(email, db)
+    if user is None:
+        raise SystemExit(f"No user with email {email!r}")
+
+    today = date.today()
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode, plan in _PLANS.items():
+        timings: list[float] = []
+        for i in range(warmup + runs):
+            async with async_session() as db:
+                start = time.perf_counter()
+                await plan(user.id, today, db)
+                elapsed = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                timings.append(elapsed)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, round(len(timings) * 0.95))]
+        print(f"{mode:<12}{statistics.median(timings):>10.2f}{p95:>10.2f}{timings[-1]:>10.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("email", help="user whose journal to summarise")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3, help="untimed runs per mode")
+    args = parser.parse_args()
+    asyncio.run(_bench(args.email, args.runs, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
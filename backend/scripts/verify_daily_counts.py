@@ -0,0 +1,49 @@
+"""Check the user_daily_counts rollup against entries, optionally repairing drift.
+
+Logs every drifted (user, date) row and exits 1 if any were found, so it can
+run from cron or a CI job; ``--repair`` rebuilds the drifted users' rollups
+and summary stats and exits 0::
+
+    uv run python -m scripts.verify_daily_counts
+    uv run python -m scripts.verify_daily_counts --user user@example.com --repair
+"""
+
+import argparse
+import asyncio
+
+from app.core.logging import setup_logging
+from app.db.session import async_session, engine
+from app.repositories import user_repo
+from app.services.analytics_service import verify_daily_counts
+
+
+async def _verify(email: str | None, repair: bool) -> int:
+    async with async_session() as db:
+        user_id = None
+        if email is not None:
+            user = await user_repo.find_by_email(email, db)
+            if user is None:
+                raise SystemExit(f"No user with email {email!r}")
+            user_id = user.id
+
+        drifted = await verify_daily_counts(db, user_id=user_id, repair=repair)
+        if repair:
+            # Also publishes the cache invalidations to running workers.
+            await db.commit()
+    await engine.dispose()
+
+    print(f"{drifted} drifted row(s){' repaired' if repair and drifted else ''}")
+    return 1 if drifted and not repair else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", metavar="EMAIL", help="check one user instead of everyone")
+    parser.add_argument("--repair", action="store_true", help="rebuild drifted users' rollups")
+    args = parser.parse_args()
+    setup_logging()
+    raise SystemExit(asyncio.run(_verify(args.user, args.repair)))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,14 @@ from datetime import date, timedelta
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import analytics_cache
+from app.core.config import settings
+from app.models.user_daily_count import UserDailyCount
+from app.services.analytics_service import get_summary, verify_daily_counts
 
 # ------------------------------------------------------------------ helpers
 
@@ -105,6 +113,52 @@ async def test_heatmap_multiple_dates(client: AsyncClient):
     assert data[1]["date"] == d2
 
 
+@pytest.mark.asyncio
+async def test_heatmap_follows_date_changes_and_deletes(client: AsyncClient):
+    """The rollup moves an entry between days on re-date and drops it on delete."""
+    await _register_and_login(client)
+    d1 = (date.today() - timedelta(days=1)).isoformat()
+    d2 = date.today().isoformat()
+    first = await _create_entry(client, d1)
+    second = await _create_entry(client, d1)
+
+    await client.put(f"/entries/{first['id']}", json={"date": d2})
+    data = (await client.get("/analytics/heatmap")).json()
+    assert data == [{"date": d1, "count": 1}, {"date": d2, "count": 1}]
+
+    await client.put(f"/entries/{second['id']}", json={"date": d2, "tags": ["moved"]})
+    await client.delete(f"/entries/{first['id']}")
+    data = (await client.get("/analytics/heatmap")).json()
+    assert data == [{"date": d2, "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_verify_daily_counts_repairs_drift(client: AsyncClient):
+    """Drift in the rollup is reported and rebuilt from entries."""
+    await _register_and_login(client)
+    user_id = uuid.UUID((await client.get("/auth/me")).json()["id"])
+    today = date.today().isoformat()
+    await _create_entry(client, today)
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as db:
+            await db.execute(
+                update(UserDailyCount)
+                .where(UserDailyCount.user_id == user_id)
+                .values(count=UserDailyCount.count + 5)
+            )
+            assert await verify_daily_counts(db, user_id) == 1
+            assert await verify_daily_counts(db, user_id, repair=True) == 1
+            assert await verify_daily_counts(db, user_id) == 0
+            await db.commit()
+    finally:
+        await engine.dispose()
+
+    data = (await client.get("/analytics/heatmap")).json()
+    assert data == [{"date": today, "count": 1}]
+
+
 @pytest.mark.asyncio
 async def test_heatmap_unauthenticated(client: AsyncClient):
     resp = await client.get("/analytics/heatmap")
@@ -190,12 +244,88 @@ async def test_summary_entries_this_month(client: AsyncClient):
     assert data["entries_this_month"] == 1
 
 
+@pytest.mark.asyncio
+async def test_summary_follows_updates_and_deletes(client: AsyncClient):
+    """The maintained summary tracks backdated entries, re-dates, tag edits and deletes."""
+    await _register_and_login(client)
+    today = date.today()
+    days = [(today - timedelta(days=i)).isoformat() for i in range(4)]
+
+    await _create_entry(client, days[0], tags=["go"])
+    await _create_entry(client, days[2], tags=["go"])
+    gap = await _create_entry(client, days[3], tags=["rust"])
+    data = (await client.get("/analytics/summary")).json()
+    assert (data["current_streak"], data["longest_streak"]) == (1, 2)
+
+    # Backdating into the gap merges the two runs
+    bridge = await _create_entry(client, days[1], tags=["rust"])
+    data = (await client.get("/analytics/summary")).json()
+    assert (data["current_streak"], data["longest_streak"]) == (4, 4)
+
+    await client.put(f"/entries/{gap['id']}", json={"tags": ["rust", "zig"]})
+    await client.put(f"/entries/{bridge['id']}", json={"date": days[0]})
+    data = (await client.get("/analytics/summary")).json()
+    assert (data["current_streak"], data["longest_streak"]) == (1, 2)
+    assert data["most_used_tag"] == "go"  # 2 each for go and rust; ties go by name
+
+    await client.delete(f"/entries/{gap['id']}")
+    data = (await client.get("/analytics/summary")).json()
+    assert data["total_entries"] == 3
+    assert data["longest_streak"] == 1
+    assert data["most_used_tag"] == "go"
+
+
+@pytest.mark.asyncio
+async def test_summary_modes_agree(client: AsyncClient):
+    """Every summary query plan returns the same metrics."""
+    await _register_and_login(client)
+    user_id = uuid.UUID((await client.get("/auth/me")).json()["id"])
+    today = date.today()
+    for i in (0, 1, 3):
+        await _create_entry(client, (today - timedelta(days=i)).isoformat(), tags=["go"])
+    for _ in range(3):
+        await _create_entry(client, today.isoformat(), tags=["rust"])  # ties with "go"
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as db:
+            results = {}
+            for mode in ("stats", "single", "concurrent", "serial"):
+                analytics_cache.invalidate_for_user(user_id)
+                results[mode] = await get_summary(user_id, db, mode=mode)
+    finally:
+        await engine.dispose()
+
+    assert results["stats"]["total_entries"] == 6
+    assert results["stats"]["current_streak"] == 2
+    assert results["stats"]["most_used_tag"] == "go"  # ties go by name in every mode
+    assert all(result == results["stats"] for result in results.values())
+
+
 @pytest.mark.asyncio
 async def test_summary_unauthenticated(client: AsyncClient):
     resp = await client.get("/analytics/summary")
     assert resp.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_analytics_conditional_requests(client: AsyncClient):
+    """Unchanged data → 304 on both endpoints; a write → fresh 200."""
+    await _register_and_login(client)
+    await _create_entry(client, date.today().isoformat())
+
+    etags = {}
+    for path in ("/analytics/heatmap", "/analytics/summary"):
+        etags[path] = (await client.get(path)).headers["etag"]
+        resp = await client.get(path, headers={"If-None-Match": etags[path]})
+        assert resp.status_code == 304
+
+    await _create_entry(client, date.today().isoformat())
+    for path, etag in etags.items():
+        resp = await client.get(path, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+
+
 # ------------------------------------------------------------------ isolation
 
 
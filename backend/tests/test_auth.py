@@ -110,3 +110,36 @@ async def test_logout(client: AsyncClient):
     response = await client.post("/auth/logout")
     assert response.status_code == 200
     assert response.json()["message"] == "Logged out successfully"
+
+
+async def test_password_change_and_deletion_revoke_tokens(client: AsyncClient):
+    email = unique_email()
+    await client.post(
+        "/auth/register",
+        json={"email": email, "password": "testpass123"},
+    )
+    login_response = await client.post(
+        "/auth/login",
+        json={"email": email, "password": "testpass123"},
+    )
+    token = login_response.cookies.get("access_token")
+    client.cookies.set("access_token", token)
+
+    assert (await client.get("/auth/me")).status_code == 200  # resolved and cached
+    response = await client.put(
+        "/auth/password",
+        json={"current_password": "testpass123", "new_password": "newpass456"},
+    )
+    assert response.status_code == 200
+    fresh_token = response.cookies.get("access_token")
+    assert fresh_token is not None and fresh_token != token
+
+    client.cookies.set("access_token", token)
+    assert (await client.get("/auth/me")).status_code == 401  # signed out by the change
+    client.cookies.set("access_token", fresh_token)
+    assert (await client.get("/auth/me")).json()["email"] == email
+
+    assert (await client.delete("/auth/account")).status_code == 204
+    client.cookies.set("access_token", fresh_token)  # the response cleared it; replay it
+    response = await client.get("/auth/me")
+    assert response.status_code == 401
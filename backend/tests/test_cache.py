@@ -0,0 +1,366 @@
+"""Tests for the in-memory analytics cache."""
+
+import asyncio
+import time
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import invalidation
+from app.core.cache import (
+    MemoryBackend,
+    TTLCache,
+    cached,
+    decode_value,
+    encode_value,
+    invalidate_tags,
+    user_tag,
+)
+from app.core.invalidation import CHANNEL, InvalidationListener
+
+
+def test_get_set_and_expiry(monkeypatch):
+    cache = TTLCache(ttl=60)
+    cache.set(("summary", 1), {"total": 3})
+    assert cache.get(("summary", 1)) == {"total": 3}
+
+    later = time.monotonic() + 61
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert cache.get(("summary", 1)) is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_cache_ttl(monkeypatch):
+    cache = TTLCache(ttl=60)
+    cache.set(("short",), 1, ttl=5)
+    cache.set(("long",), 2)
+
+    later = time.monotonic() + 6
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert cache.get(("short",)) is None
+    assert cache.get(("long",)) == 2
+
+
+def test_lru_eviction_by_count():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set(("a", 1), 1)
+    cache.set(("b", 1), 2)
+    cache.get(("a", 1))  # "b" is now least recently used
+    cache.set(("c", 1), 3)
+
+    assert cache.get(("b", 1)) is None
+    assert cache.get(("a", 1)) == 1
+    assert cache.get(("c", 1)) == 3
+
+
+def test_lru_eviction_by_bytes():
+    cache = TTLCache(ttl=60, max_bytes=2_000)
+    cache.set(("a", 1), "x" * 900)
+    cache.set(("b", 1), "x" * 900)
+    cache.set(("c", 1), "x" * 900)
+
+    assert cache.get(("a", 1)) is None
+    assert cache.get(("c", 1)) is not None
+
+    cache.set(("huge", 1), "x" * 5_000)  # larger than the whole budget: not cached
+    assert cache.get(("huge", 1)) is None
+    assert cache.get(("c", 1)) is not None
+
+
+def test_sweep_drops_unread_expired_keys(monkeypatch):
+    cache = TTLCache(ttl=60, sweep_interval=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set(("heatmap", 1, "2026-01-01", None), [])
+    cache.set(("heatmap", 2, "2026-02-01", None), [])
+
+    now += 61
+    cache.set(("summary", 3), {})  # past the sweep interval: sweeps on write
+    assert len(cache) == 1
+
+
+def test_invalidate_for_user_and_prefix():
+    user_a, user_b = uuid.uuid4(), uuid.uuid4()
+    cache = TTLCache(ttl=60)
+    cache.set(("heatmap", user_a, None, None), [])
+    cache.set(("summary", user_a), {})
+    cache.set(("summary", user_b), {})
+
+    cache.invalidate_prefix(("heatmap", user_a))
+    assert cache.get(("heatmap", user_a, None, None)) is None
+    assert cache.get(("summary", user_a)) == {}
+
+    cache.invalidate_for_user(user_a)
+    assert cache.get(("summary", user_a)) is None
+    assert cache.get(("summary", user_b)) == {}
+    assert len(cache) == 1
+
+
+async def test_get_or_compute_coalesces_concurrent_misses():
+    cache = TTLCache(ttl=60)
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"total": 1}
+
+    waiters = [
+        asyncio.ensure_future(cache.get_or_compute(("summary", 1), compute)) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [{"total": 1}] * 5
+    assert calls == 1
+    assert cache.get(("summary", 1)) == {"total": 1}
+
+
+async def test_get_or_compute_propagates_errors_without_caching():
+    cache = TTLCache(ttl=60)
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    waiters = [asyncio.ensure_future(cache.get_or_compute(("summary", 1), fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def succeed():
+        return {"total": 2}
+
+    assert await cache.get_or_compute(("summary", 1), succeed) == {"total": 2}
+
+
+async def test_invalidation_during_compute_is_not_cached():
+    cache = TTLCache(ttl=60)
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return {"total": 1}
+
+    waiter = asyncio.ensure_future(cache.get_or_compute(("summary", 1), compute))
+    await asyncio.sleep(0)
+    cache.invalidate_for_user(1)
+    release.set()
+
+    assert await waiter == {"total": 1}
+    assert cache.get(("summary", 1)) is None
+
+
+async def test_stale_value_served_while_refreshing(monkeypatch):
+    cache = TTLCache(ttl=60, soft_ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set(("summary", 1), {"total": 1})
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()  # a stale hit must not block on this
+        return {"total": 2}
+
+    now += 11
+    assert await cache.get_or_compute(("summary", 1), compute) == {"total": 1}
+    release.set()
+    for _ in range(3):  # let the refresh task finish and its callback store the result
+        await asyncio.sleep(0)
+    assert cache.get(("summary", 1)) == {"total": 2}
+
+
+async def test_hard_expired_or_invalidated_value_is_recomputed(monkeypatch):
+    cache = TTLCache(ttl=60, soft_ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    async def compute():
+        return {"total": 2}
+
+    cache.set(("summary", 1), {"total": 1})
+    now += 61
+    assert await cache.get_or_compute(("summary", 1), compute) == {"total": 2}
+
+    cache.set(("summary", 1), {"total": 1})
+    cache.invalidate_for_user(1)
+    assert await cache.get_or_compute(("summary", 1), compute) == {"total": 2}
+
+
+def test_invalidation_listener_evicts_notified_tags_and_users():
+    user_a, user_b = uuid.uuid4(), uuid.uuid4()
+    cache = TTLCache(ttl=60)
+    cache.set(("tags", user_a), ["go"], tags=(f"user:{user_a}:tags",))
+    cache.set(("summary", user_a), {}, tags=(f"user:{user_a}:entries",))
+    cache.set(("summary", user_b), {})
+    listener = InvalidationListener(cache.invalidate_for_user, cache.invalidate_tags, cache.clear)
+
+    listener._notify(None, 1, CHANNEL, "not-a-uuid")
+    assert len(cache) == 3
+
+    listener._notify(None, 1, CHANNEL, f"user:{user_a}:tags")
+    assert cache.get(("tags", user_a)) is None
+    assert cache.get(("summary", user_a)) == {}
+
+    listener._notify(None, 1, CHANNEL, str(user_b))
+    assert cache.get(("summary", user_b)) is None
+    assert len(cache) == 1
+
+
+async def test_invalidate_evicts_locally_only_after_commit(monkeypatch):
+    monkeypatch.setattr(invalidation.settings, "CACHE_INVALIDATION_NOTIFY", False)
+    user_id = uuid.uuid4()
+    cache = TTLCache(ttl=60)
+    session = Session(create_engine("sqlite://"))
+    db = SimpleNamespace(sync_session=session)  # on_commit only needs the sync session
+
+    cache.set(("summary", user_id), {"total": 1}, tags=(user_tag(user_id, "entries"),))
+    session.execute(text("SELECT 1"))
+    await invalidation.invalidate(db, user_tag(user_id, "entries"))
+    session.rollback()
+    assert cache.get(("summary", user_id)) == {"total": 1}  # nothing was written
+
+    session.execute(text("SELECT 1"))
+    await invalidation.invalidate(db, user_tag(user_id, "entries"))
+    assert cache.get(("summary", user_id)) == {"total": 1}  # readers still see pre-commit data
+    session.commit()
+    assert cache.get(("summary", user_id)) is None
+
+
+async def test_invalidation_listener_survives_unexpected_errors(monkeypatch):
+    real_sleep = asyncio.sleep
+    attempts = []
+    resets = []
+    listening = asyncio.Event()
+
+    class FakeConnection:
+        async def add_listener(self, channel, callback):
+            pass
+
+        async def execute(self, query, timeout=None):
+            await real_sleep(3600)
+
+        async def close(self, timeout=None):
+            pass
+
+    async def connect(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise TimeoutError  # not an OSError / PostgresError
+        return FakeConnection()
+
+    def on_reset():
+        resets.append(1)
+        if len(resets) == 1:
+            raise RuntimeError("reset failed")
+        listening.set()
+
+    monkeypatch.setattr(invalidation.asyncpg, "connect", connect)
+    monkeypatch.setattr(invalidation.asyncio, "sleep", lambda _delay: real_sleep(0))
+    listener = InvalidationListener(lambda _user: None, lambda *_tags: None, on_reset)
+    await listener.start()
+    try:
+        await asyncio.wait_for(listening.wait(), 1)
+    finally:
+        await listener.stop()
+    assert (len(attempts), len(resets)) == (3, 2)
+
+
+async def test_cached_decorator_keys_by_arguments_and_invalidates_by_tag():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    @cached("tags", cache=cache, tags=("user:{user_id}:tags",))
+    async def list_tags(user_id: int, db: object, query: str | None = None) -> list[str]:
+        assert isinstance(db, str)  # a miss runs on the caller's session
+        calls.append((user_id, query))
+        return [f"{user_id}:{query}"]
+
+    assert await list_tags(1, db="session-a") == ["1:None"]
+    assert await list_tags(1, "session-b") == ["1:None"]  # db is not part of the key
+    assert await list_tags(1, "session-b", query="py") == ["1:py"]
+    assert await list_tags(2, "session-b") == ["2:None"]
+    assert len(calls) == 3
+
+    invalidate_tags(user_tag(1, "tags"))
+    await list_tags(1, "session-c")
+    await list_tags(2, "session-c")
+    assert len(calls) == 4
+
+
+async def test_cached_decorator_refreshes_on_its_own_session(monkeypatch):
+    cache = TTLCache(ttl=60, soft_ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    sessions = []
+
+    @cached("tags", cache=cache)
+    async def list_tags(user_id: int, db: object) -> list[str]:
+        sessions.append(db)
+        return [str(len(sessions))]
+
+    assert await list_tags(1, "session-a") == ["1"]
+    now += 11
+    assert await list_tags(1, "session-b") == ["1"]  # stale, refreshed in the background
+    for _ in range(10):  # let the refresh run, close its session and store the result
+        await asyncio.sleep(0)
+    assert sessions[0] == "session-a"
+    assert isinstance(sessions[1], AsyncSession)  # not the caller's, which may be closed
+    assert cache.get(("tags", 1)) == ["2"]
+
+
+async def test_cached_decorator_entries_expire_on_their_own_ttl(monkeypatch):
+    cache = TTLCache(ttl=60)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    calls = []
+
+    @cached("summary", cache=cache, ttl=5)
+    async def summary(user_id: int) -> int:
+        calls.append(user_id)
+        return len(calls)
+
+    assert await summary(1) == 1
+    now += 4
+    assert await summary(1) == 1
+    now += 2  # past the decorator's TTL, well within the cache's
+    assert await summary(1) == 2
+
+
+def test_value_encoding_round_trip():
+    value = [{"date": date(2026, 10, 16), "count": 3}, {"id": uuid.uuid4(), "tag": None}]
+    assert decode_value(encode_value(value)) == value
+
+    big = [{"date": date(2026, 1, 1), "count": i} for i in range(200)]
+    payload = encode_value(big)
+    assert payload[:1] == b"z"
+    assert decode_value(payload) == big
+
+
+async def test_shared_tier_serves_other_workers_until_invalidated():
+    shared = MemoryBackend()
+    worker_a, worker_b = TTLCache(ttl=60, shared=shared), TTLCache(ttl=60, shared=shared)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return [{"date": date(2026, 10, 16), "count": calls}]
+
+    key = ("heatmap", 1, None, None)
+    first = await worker_a.get_or_compute(key, compute)
+    assert await worker_b.get_or_compute(key, compute) == first
+    assert calls == 1
+
+    shared.invalidate_for_user(1)
+    worker_b.invalidate_for_user(1)
+    assert (await worker_b.get_or_compute(key, compute))[0]["count"] == 2
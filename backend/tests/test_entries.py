@@ -1,6 +1,12 @@
 """Tests for Entry CRUD API endpoints."""
 
+import asyncio
+import gzip
+import io
+import json
 import uuid
+import zipfile
+from unittest.mock import MagicMock, patch
 
 from httpx import AsyncClient
 
@@ -68,6 +74,48 @@ async def test_create_entry_with_tags_and_links(client: AsyncClient):
     assert data["links"][0]["url"] == "https://fastapi.tiangolo.com"
 
 
+async def test_create_entry_response_matches_stored_entry(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-22",
+            "title": "Round trip",
+            "content": "Built from the objects just written.",
+            "tags": ["a", "b"],
+            "links": [{"url": "https://one.example"}, {"url": "https://two.example"}],
+        },
+    )
+    created = create_resp.json()
+    assert created["created_at"] is not None
+    assert created["attachments"] == []
+
+    fetched = (await client.get(f"/entries/{created['id']}")).json()
+    assert fetched["created_at"] == created["created_at"]
+    assert fetched["updated_at"] == created["updated_at"]
+    assert sorted(t["id"] for t in fetched["tags"]) == sorted(t["id"] for t in created["tags"])
+    assert sorted(lk["id"] for lk in fetched["links"]) == sorted(
+        lk["id"] for lk in created["links"]
+    )
+
+
+async def test_create_entries_concurrently_with_same_new_tag(client: AsyncClient):
+    await _register_and_login(client)
+    tag_name = f"race-{uuid.uuid4().hex[:6]}"
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/entries",
+                json={"date": "2026-02-22", "content": f"Racer {i}", "tags": [tag_name, "Shared"]},
+            )
+            for i in range(5)
+        )
+    )
+    assert [r.status_code for r in responses] == [201] * 5
+    tag_ids = {t["id"] for r in responses for t in r.json()["tags"] if t["name"] == tag_name}
+    assert len(tag_ids) == 1
+
+
 async def test_create_entry_unauthenticated(client: AsyncClient):
     response = await client.post(
         "/entries",
@@ -76,6 +124,76 @@ async def test_create_entry_unauthenticated(client: AsyncClient):
     assert response.status_code == 401
 
 
+async def test_bulk_create_json_array(client: AsyncClient):
+    await _register_and_login(client)
+    response = await client.post(
+        "/entries/bulk",
+        json=[
+            {"date": "2026-01-01", "content": "Day one", "tags": ["import", "Go"]},
+            {"date": "2026-01-02"},
+            {
+                "date": "2026-01-03",
+                "content": "Day three",
+                "tags": ["go"],
+                "links": [{"url": "https://go.dev"}],
+            },
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][1]["id"] is None
+    assert "content" in data["results"][1]["error"]
+
+    entry = (await client.get(f"/entries/{data['results'][2]['id']}")).json()
+    assert [t["name"] for t in entry["tags"]] == ["go"]
+    assert entry["links"][0]["url"] == "https://go.dev"
+    assert sorted((await client.get("/entries/tags")).json()) == ["go", "import"]
+
+
+async def test_bulk_create_reports_oversized_fields_per_item(client: AsyncClient):
+    await _register_and_login(client)
+    response = await client.post(
+        "/entries/bulk",
+        json=[
+            {"date": "2026-01-01", "content": "Fine"},
+            {"date": "2026-01-02", "content": "Long tag", "tags": ["x" * 101]},
+            {"date": "2026-01-03", "content": "Long url", "links": [{"url": "x" * 2001}]},
+            {"date": "2026-01-04", "content": "Long title", "title": "x" * 501},
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (1, 3)
+    assert [r["error"] is None for r in data["results"]] == [True, False, False, False]
+
+
+async def test_bulk_create_ndjson(client: AsyncClient):
+    await _register_and_login(client)
+    body = "\n".join(
+        [
+            '{"date": "2026-01-01", "content": "One"}',
+            "not json",
+            '{"date": "2026-01-02", "content": "Two"}',
+            "",
+        ]
+    )
+    response = await client.post(
+        "/entries/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+
+    listing = await client.get("/entries", params={"total": "estimate"})
+    assert listing.json()["total"] == 2
+
+
 # ----------------------------- Read
 
 
@@ -152,6 +270,252 @@ async def test_list_entries_filter_by_tag(client: AsyncClient):
     assert data["total"] >= 1
 
 
+async def test_list_entries_cursor_pagination(client: AsyncClient):
+    await _register_and_login(client)
+    for day in ("2026-02-18", "2026-02-19", "2026-02-19", "2026-02-20", "2026-02-21"):
+        await client.post("/entries", json={"date": day, "content": f"Entry on {day}"})
+
+    seen: list[str] = []
+    params: dict = {"limit": 2}
+    while True:
+        response = await client.get("/entries", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(e["id"] for e in data["entries"])
+        if data["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": data["next_cursor"]}
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+async def test_list_entries_invalid_cursor(client: AsyncClient):
+    await _register_and_login(client)
+    response = await client.get("/entries", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_list_entries_total_modes(client: AsyncClient):
+    await _register_and_login(client)
+    for day in ("2026-02-20", "2026-02-21", "2026-02-22"):
+        await client.post("/entries", json={"date": day, "content": f"Entry on {day}"})
+    first = (await client.get("/entries", params={"limit": 1})).json()
+    await client.delete(f"/entries/{first['entries'][0]['id']}")
+
+    exact = (await client.get("/entries", params={"limit": 1, "total": "exact"})).json()
+    estimate = (await client.get("/entries", params={"limit": 1, "total": "estimate"})).json()
+    none = (await client.get("/entries", params={"limit": 1, "total": "none"})).json()
+    past_end = (await client.get("/entries", params={"offset": 10, "total": "exact"})).json()
+
+    assert exact["total"] == 2
+    assert estimate["total"] == 2
+    assert none["total"] is None
+    assert len(none["entries"]) == 1
+    assert past_end["entries"] == []
+    assert past_end["total"] == 2
+
+
+async def test_list_entries_summary_view(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-22",
+            "title": "Summary",
+            "content": "First line.\n\n   Second   line.",
+            "tags": ["python", "async"],
+            "links": [{"url": "https://example.com"}, {"url": "https://example.org"}],
+        },
+    )
+
+    response = await client.get("/entries", params={"view": "summary"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    item = data["entries"][0]
+    assert "content" not in item
+    assert item["excerpt"] == "First line. Second line."
+    assert item["tags"] == ["async", "python"]
+    assert item["link_count"] == 2
+    assert item["attachment_count"] == 0
+
+
+async def test_list_entries_fulltext_search_ranks_and_highlights(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={"date": "2026-02-20", "content": "Read a chapter about <b>goroutines</b>."},
+    )
+    await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-19",
+            "title": "Goroutines",
+            "content": "Goroutines and channels in depth.",
+        },
+    )
+
+    response = await client.get(
+        "/entries", params={"search": "goroutines", "search_mode": "fulltext"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    # Title matches are weighted above content matches, regardless of date
+    assert data["entries"][0]["title"] == "Goroutines"
+    assert "<mark>" in data["entries"][0]["snippet"]
+    # User content is escaped; <mark> is the only markup
+    assert "&lt;b&gt;" in data["entries"][1]["snippet"]
+    assert "<b>" not in data["entries"][1]["snippet"]
+
+
+async def test_list_entries_substring_search_mode(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "content": "Debugged the useEffectCleanup hook."},
+    )
+
+    fulltext = await client.get(
+        "/entries", params={"search": "EffectClean", "search_mode": "fulltext"}
+    )
+    assert fulltext.json()["total"] == 0
+
+    response = await client.get("/entries", params={"search": "EffectClean"})  # the default
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["entries"][0]["snippet"] is None
+
+
+async def test_list_entries_trigram_search_tolerates_typos(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "content": "Profiled the serializer with py-spy."},
+    )
+
+    partial = await client.get("/entries", params={"search": "erializ", "search_mode": "trigram"})
+    assert partial.status_code == 200
+    assert partial.json()["total"] == 1
+
+    typo = await client.get("/entries", params={"search": "serialzer", "search_mode": "trigram"})
+    assert typo.status_code == 200
+    assert typo.json()["total"] == 1
+
+
+async def test_list_tags_fuzzy_query(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "content": "Tagged", "tags": ["kubernetes", "python"]},
+    )
+
+    response = await client.get("/entries/tags", params={"q": "kubernets"})
+    assert response.status_code == 200
+    assert response.json() == ["kubernetes"]
+
+
+async def test_list_endpoints_answer_304_until_data_changes(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post("/entries", json={"date": "2026-02-22", "content": "One", "tags": ["a"]})
+
+    for path in ("/entries", "/entries/tags"):
+        first = await client.get(path)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        cached = await client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+    await client.post("/entries", json={"date": "2026-02-23", "content": "Two"})
+    fresh = await client.get("/entries", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["total"] == 2
+
+
+async def test_get_entry_if_none_match(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post("/entries", json={"date": "2026-02-22", "content": "One"})
+    entry_id = create_resp.json()["id"]
+    etag = (await client.get(f"/entries/{entry_id}")).headers["etag"]
+
+    cached = await client.get(f"/entries/{entry_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    await client.put(f"/entries/{entry_id}", json={"tags": ["new"]})
+    fresh = await client.get(f"/entries/{entry_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert [t["name"] for t in fresh.json()["tags"]] == ["new"]
+
+
+@patch("app.services.storage_service.get_s3_client", MagicMock())
+async def test_attachment_upload_invalidates_entry_etag(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post("/entries", json={"date": "2026-02-22", "content": "One"})
+    entry_id = create_resp.json()["id"]
+    etag = (await client.get(f"/entries/{entry_id}")).headers["etag"]
+    assert etag == '"1"'
+
+    upload = await client.post(
+        "/uploads",
+        data={"entry_id": entry_id},
+        files={"file": ("notes.pdf", io.BytesIO(b"%PDF-1.4"), "application/pdf")},
+    )
+    assert upload.status_code == 201
+
+    fresh = await client.get(f"/entries/{entry_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] == '"2"'
+    assert [a["file_name"] for a in fresh.json()["attachments"]] == ["notes.pdf"]
+
+
+# ----------------------------- Export
+
+
+async def test_export_ndjson(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-21",
+            "content": "First",
+            "tags": ["export"],
+            "links": [{"title": "Docs", "url": "https://example.com"}],
+        },
+    )
+    await client.post("/entries", json={"date": "2026-02-22", "content": "Second"})
+
+    response = await client.get("/entries/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    lines = [json.loads(line) for line in gzip.decompress(response.content).splitlines()]
+    assert [line["content"] for line in lines] == ["First", "Second"]
+    assert lines[0]["tags"] == ["export"]
+    assert lines[0]["links"] == [{"title": "Docs", "url": "https://example.com"}]
+    assert lines[1]["attachments"] == []
+
+
+async def test_export_markdown_zip(client: AsyncClient):
+    await _register_and_login(client)
+    await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "title": "Zip me", "content": "# Heading\n\nBody"},
+    )
+
+    response = await client.get("/entries/export", params={"format": "markdown-zip"})
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    [name] = archive.namelist()
+    assert name.startswith("entries/2026-02-22_")
+    markdown = archive.read(name).decode()
+    assert 'title: "Zip me"' in markdown
+    assert markdown.endswith("# Heading\n\nBody\n")
+
+
 # ----------------------------- Update
 
 
@@ -173,6 +537,132 @@ async def test_update_entry(client: AsyncClient):
     assert any(t["name"] == "updated" for t in data["tags"])
 
 
+async def test_update_entry_diffs_tags_and_links(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-22",
+            "content": "Original",
+            "tags": ["keep", "drop"],
+            "links": [
+                {"title": "Keep", "url": "https://keep.example"},
+                {"title": "Drop", "url": "https://drop.example"},
+            ],
+        },
+    )
+    created = create_resp.json()
+    kept_link_id = next(lk["id"] for lk in created["links"] if lk["title"] == "Keep")
+
+    response = await client.put(
+        f"/entries/{created['id']}",
+        json={
+            "tags": ["keep", "new"],
+            "links": [
+                {"title": "Keep", "url": "https://keep.example"},
+                {"title": "New", "url": "https://new.example"},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(t["name"] for t in data["tags"]) == ["keep", "new"]
+    assert [lk["title"] for lk in data["links"]] == ["Keep", "New"]
+    assert data["links"][0]["id"] == kept_link_id
+    assert data["updated_at"] >= created["updated_at"]
+
+    # The returned aggregate matches what a fresh read sees
+    fetched = (await client.get(f"/entries/{created['id']}")).json()
+    assert sorted(t["name"] for t in fetched["tags"]) == ["keep", "new"]
+    assert sorted(lk["id"] for lk in fetched["links"]) == sorted(lk["id"] for lk in data["links"])
+
+
+async def test_update_entry_scalar_only_keeps_relations(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries",
+        json={
+            "date": "2026-02-22",
+            "content": "Original",
+            "tags": ["kept"],
+            "links": [{"title": "Docs", "url": "https://example.com"}],
+        },
+    )
+    created = create_resp.json()
+    assert created["version"] == 1
+
+    response = await client.put(f"/entries/{created['id']}", json={"title": "Renamed"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Renamed"
+    assert data["content"] == "Original"
+    assert data["version"] == 2
+    assert response.headers["etag"] == '"2"'
+    assert [t["name"] for t in data["tags"]] == ["kept"]
+    assert data["links"] == created["links"]
+
+    # The title is searchable straight away: search_vector was rebuilt in the same UPDATE.
+    search = await client.get("/entries", params={"search": "renamed"})
+    assert [e["id"] for e in search.json()["entries"]] == [created["id"]]
+
+
+async def test_update_entry_scalar_only_with_stored_values_writes_nothing(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries", json={"date": "2026-02-22", "title": "Same", "content": "Same"}
+    )
+    created = create_resp.json()
+    list_etag = (await client.get("/entries")).headers["etag"]
+
+    response = await client.put(
+        f"/entries/{created['id']}",
+        json={"date": "2026-02-22", "title": "Same", "content": "Same"},
+        headers={"If-Match": '"1"'},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    assert response.json()["updated_at"] == created["updated_at"]
+    # The data version did not move either, so list validators still hold.
+    cached = await client.get("/entries", headers={"If-None-Match": list_etag})
+    assert cached.status_code == 304
+
+
+async def test_update_entry_if_match(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "content": "Original"},
+    )
+    entry_id = create_resp.json()["id"]
+    etag = (await client.get(f"/entries/{entry_id}")).headers["etag"]
+
+    first = await client.put(
+        f"/entries/{entry_id}", json={"content": "First"}, headers={"If-Match": etag}
+    )
+    assert first.status_code == 200
+
+    # Same precondition again: the version moved on, so both write paths refuse.
+    stale = await client.put(
+        f"/entries/{entry_id}", json={"content": "Second"}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+    stale = await client.put(
+        f"/entries/{entry_id}", json={"tags": ["x"]}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+    assert (await client.get(f"/entries/{entry_id}")).json()["content"] == "First"
+
+    bad = await client.put(
+        f"/entries/{entry_id}", json={"content": "x"}, headers={"If-Match": 'W/"2"'}
+    )
+    assert bad.status_code == 412
+
+    missing = await client.put(
+        f"/entries/{uuid.uuid4()}", json={"content": "x"}, headers={"If-Match": etag}
+    )
+    assert missing.status_code == 404
+
+
 async def test_update_entry_not_found(client: AsyncClient):
     await _register_and_login(client)
     fake_id = str(uuid.uuid4())
@@ -202,6 +692,24 @@ async def test_delete_entry(client: AsyncClient):
     assert get_resp.status_code == 404
 
 
+async def test_delete_entry_if_match(client: AsyncClient):
+    await _register_and_login(client)
+    create_resp = await client.post(
+        "/entries",
+        json={"date": "2026-02-22", "content": "To be deleted"},
+    )
+    entry_id = create_resp.json()["id"]
+    await client.put(f"/entries/{entry_id}", json={"content": "Edited"})
+
+    stale = await client.delete(f"/entries/{entry_id}", headers={"If-Match": '"1"'})
+    assert stale.status_code == 412
+
+    response = await client.delete(f"/entries/{entry_id}", headers={"If-Match": '"2"'})
+    assert response.status_code == 204
+    listing = await client.get("/entries", params={"total": "estimate"})
+    assert listing.json()["total"] == 0
+
+
 async def test_delete_entry_not_found(client: AsyncClient):
     await _register_and_login(client)
     fake_id = str(uuid.uuid4())
@@ -0,0 +1,46 @@
+"""Tests for entry ETag helpers."""
+
+import uuid
+
+import pytest
+
+from app.core.etag import data_etag, entry_etag, etag_matches, parse_if_match
+
+
+def test_etag_round_trip():
+    assert parse_if_match(entry_etag(7)) == 7
+
+
+@pytest.mark.parametrize("header", [None, "*", " * "])
+def test_if_match_without_precondition(header: str | None):
+    assert parse_if_match(header) is None
+
+
+@pytest.mark.parametrize("header", ["", "7", 'W/"7"', '"7", "8"', '"abc"'])
+def test_if_match_unusable_tag(header: str):
+    with pytest.raises(ValueError):
+        parse_if_match(header)
+
+
+def test_data_etag_is_weak_and_user_scoped():
+    user_a, user_b = uuid.uuid4(), uuid.uuid4()
+    etag = data_etag(user_a, 5)
+
+    assert etag.startswith('W/"')
+    assert etag != data_etag(user_b, 5)
+    assert etag != data_etag(user_a, 5, "2026-10-16")
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ("*", True),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"x", W/"abc"', True),
+        ('W/"abd"', False),
+    ],
+)
+def test_etag_matches_uses_weak_comparison(header: str | None, expected: bool):
+    assert etag_matches(header, 'W/"abc"') is expected
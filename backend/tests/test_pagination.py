@@ -0,0 +1,22 @@
+"""Tests for keyset-pagination cursor helpers."""
+
+import uuid
+from datetime import UTC, date, datetime
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = (date(2026, 2, 22), datetime(2026, 2, 22, 9, 30, 1, 123456, tzinfo=UTC), uuid.uuid4())
+    cursor = encode_cursor(*key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "eyJhIjogMX0"])
+def test_decode_invalid_cursor(cursor: str):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
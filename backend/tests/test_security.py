@@ -1,13 +1,28 @@
 """Tests for security utility functions."""
 
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
 import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import (
+    HashingPool,
+    HashingPoolFullError,
+    calibrate_hash_rounds,
     create_access_token,
     decode_token,
     hash_password,
+    needs_rehash,
+    set_hash_rounds,
     verify_password,
 )
+from app.services import token_revocation_service
+from app.services.token_revocation_service import DELETED, RevocationSet
 
 
 @pytest.mark.asyncio
@@ -29,6 +44,44 @@ async def test_verify_password_incorrect():
     assert await verify_password("wrongpassword", hashed) is False
 
 
+async def test_hash_rounds_setting_and_rehash_check():
+    set_hash_rounds(4)
+    try:
+        hashed = await hash_password("mypassword")
+        assert hashed.startswith("$2b$04$")
+        assert not needs_rehash(hashed)
+        set_hash_rounds(5)
+        assert needs_rehash(hashed)
+        assert await verify_password("mypassword", hashed) is True  # old cost still verifies
+    finally:
+        set_hash_rounds(settings.PASSWORD_HASH_ROUNDS)
+
+
+def test_calibrate_hash_rounds_stays_in_bounds():
+    assert calibrate_hash_rounds(0, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_hash_rounds(60_000, min_rounds=4, max_rounds=6) == 6
+
+
+async def test_hashing_pool_sheds_load_beyond_its_queue():
+    pool = HashingPool(workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    assert not pool.has_idle_worker()
+    with pytest.raises(HashingPoolFullError):
+        await pool.run(release.wait)
+    assert pool.stats()["queued"] == 1
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    stats = pool.stats()
+    assert (stats["in_flight"], stats["completed"]) == (0, 2)
+    assert pool.has_idle_worker()
+    pool.shutdown()
+
+
 def test_create_and_decode_token():
     user_id = "550e8400-e29b-41d4-a716-446655440000"
     token = create_access_token(user_id)
@@ -36,6 +89,8 @@ def test_create_and_decode_token():
 
     assert payload is not None
     assert payload["sub"] == user_id
+    assert payload["ver"] == 0
+    assert decode_token(create_access_token(user_id, 3))["ver"] == 3
 
 
 def test_decode_invalid_token():
@@ -46,3 +101,45 @@ def test_decode_invalid_token():
 def test_decode_empty_token():
     result = decode_token("")
     assert result is None
+
+
+def test_revocation_set_rejects_older_token_versions():
+    alice, bob, carol = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    revocations = RevocationSet()
+    revocations.replace([(alice, 2)])
+    assert revocations.ready
+    assert not revocations.accepts(alice, 1)
+    assert revocations.accepts(alice, 2)
+    assert revocations.accepts(bob, 0)
+
+    revocations.revoke(bob, DELETED)  # not yet in the next snapshot: kept
+    revocations.replace([(carol, 1)])
+    assert not revocations.accepts(bob, 5)
+    assert not revocations.accepts(carol, 0)
+    assert revocations.accepts(alice, 0)  # aged out of the table
+
+    revocations.replace([])
+    assert revocations.accepts(bob, 0)
+
+
+@pytest.mark.asyncio
+async def test_revoke_tokens_applies_in_memory_only_after_commit(monkeypatch):
+    user_id = uuid.uuid4()
+    revocations = RevocationSet()
+    monkeypatch.setattr(token_revocation_service, "revocations", revocations)
+
+    async def record_revocation(*_args):
+        session.execute(text("SELECT 1"))  # stands in for the INSERT
+
+    monkeypatch.setattr(token_revocation_service.token_revocation_repo, "revoke", record_revocation)
+    session = Session(create_engine("sqlite://"))
+    db = SimpleNamespace(sync_session=session)  # on_commit only needs the sync session
+
+    await token_revocation_service.revoke_tokens(user_id, 3, db)
+    session.rollback()
+    assert revocations.accepts(user_id, 2)  # the change failed: tokens stay valid
+
+    await token_revocation_service.revoke_tokens(user_id, 3, db)
+    assert revocations.accepts(user_id, 2)
+    session.commit()
+    assert not revocations.accepts(user_id, 2)